@@ -1,10 +1,10 @@
-from .context import FSContext
-from .identifiers import NamespaceIdentifier, AbsoluteIdentifier, RelativeIdentifier
 import sys
 import pathlib
 import argparse
 import typing
 
+# Everything else is imported when needed, keeping `--help` and start-up fast
+
 
 def get_entry_point(value: str) -> typing.Tuple[pathlib.Path, str]:
     parts = value.rsplit(':', 2)
@@ -15,21 +15,124 @@ def get_entry_point(value: str) -> typing.Tuple[pathlib.Path, str]:
     return path.absolute(), definition
 
 
+def print_result(result, args: argparse.Namespace):
+    from .printer import write
+    write(result, sys.stdout, comment=args.comments, max_length=args.max_output, share=args.share)
+    sys.stdout.write('\n')
+    sys.stdout.flush()
+
+
 def main():
     argument_parser = argparse.ArgumentParser()
     argument_parser.add_argument('entry_point', action='store', help='Entry point - directory, file, or a function')
+    argument_parser.add_argument('--prenormalize', action='store_true', help='Reduce top-level definitions at link time')
+    argument_parser.add_argument('--optimize', action='store_true', help='Inline small definitions and prune unused arguments at link time')
+    argument_parser.add_argument('--memo', action='store', type=pathlib.Path, help='File to persist known normal forms in between runs')
+    argument_parser.add_argument('--stats', action='store_true', help='Print evaluation statistics to stderr')
+    argument_parser.add_argument('--comments', action='store_true', help='Annotate values and references in the output')
+    argument_parser.add_argument('--max-output', action='store', type=int, help='Cut the output after this number of characters')
+    argument_parser.add_argument('--share', action='store_true', help='Print repeated subterms once as let bindings')
+    argument_parser.add_argument('--profile', action='store_true', help='Print cost of each definition to stderr')
+    argument_parser.add_argument('--profile-output', action='store', type=pathlib.Path, help='File to write collapsed stacks for flamegraph tools to')
+    argument_parser.add_argument('--profile-metric', action='store', choices=['steps', 'allocations', 'time'], default='steps', help='Value of collapsed stacks')
+    argument_parser.add_argument('--jobs', action='store', type=int, help='Reduce independent subterms in this number of processes')
+    argument_parser.add_argument('--parallel-threshold', action='store', type=int, default=100, help='Number of steps after which a worker splits a subterm into parts reduced independently')
+    argument_parser.add_argument('--checkpoint', action='store', type=pathlib.Path, help='File to periodically save the expression being reduced to')
+    argument_parser.add_argument('--checkpoint-every', action='store', type=int, help='Save a checkpoint every this number of steps')
+    argument_parser.add_argument('--checkpoint-seconds', action='store', type=float, help='Save a checkpoint every this number of seconds, 60 by default')
+    argument_parser.add_argument('--resume', action='store_true', help='Continue from the checkpoint')
+    argument_parser.add_argument('--progress', action='store', type=int, help='Print step number and term size to stderr every this number of steps')
+    argument_parser.add_argument('--watch', action='store_true', help='Re-evaluate whenever the sources change')
+    argument_parser.add_argument('--interval', action='store', type=float, default=1.0, help='Watch polling interval, seconds')
     args = argument_parser.parse_args()
+    if args.resume and not args.checkpoint:
+        argument_parser.error('--resume requires --checkpoint')
+    if args.watch and args.jobs:
+        argument_parser.error('--watch can not be used with --jobs')
+    if args.watch or args.jobs:
+        for option in ['stats', 'profile', 'profile_output', 'checkpoint', 'resume', 'progress']:
+            if getattr(args, option):
+                argument_parser.error('--%s can not be used with %s' % (
+                    option.replace('_', '-'), '--watch' if args.watch else '--jobs',
+                ))
+    if args.jobs and args.memo:
+        argument_parser.error('--memo can not be used with --jobs, as the workers do not share a memo table')
+
+    from .context import FSContext, EvalStats
+    from .identifiers import NamespaceIdentifier, AbsoluteIdentifier, RelativeIdentifier
 
     entry_path, entry_func = get_entry_point(args.entry_point)
     namespace_identifier = NamespaceIdentifier(entry_path.name.replace('.lcalc', ''))
 
+    memo = None
+    if args.memo:
+        from .memo import NormalFormMemo
+        memo = NormalFormMemo()
+    optimizer = None
+    if args.optimize:
+        from .optimizer import Optimizer
+        optimizer = Optimizer()
     context = FSContext(
         namespace_identifier=namespace_identifier,
         root_path=entry_path.parent,
+        prenormalize=args.prenormalize,
+        memo=memo,
+        optimizer=optimizer,
     )
-    print(context.eval(
-        absolute_identifier=AbsoluteIdentifier(namespace_identifier, RelativeIdentifier(entry_func))
-    ))
+    if memo is not None:
+        memo.load(args.memo, context.fingerprint())
+    absolute_identifier = AbsoluteIdentifier(namespace_identifier, RelativeIdentifier(entry_func))
+    if args.watch:
+        from .watch import Watcher
+
+        def evaluated(entry_point, result):
+            print_result(result, args)
+            # Changed definitions clear the memo, so it holds entries for the current fingerprint only
+            if memo is not None:
+                memo.save(args.memo, context.fingerprint())
+
+        Watcher(context, [absolute_identifier]).watch(callback=evaluated, interval=args.interval)
+    elif args.jobs:
+        from .parallel import ParallelEvaluator
+        with ParallelEvaluator(context, workers=args.jobs, threshold=args.parallel_threshold) as evaluator:
+            print_result(evaluator.eval(absolute_identifier), args)
+    else:
+        stats = EvalStats()
+        profiler = None
+        if args.profile or args.profile_output:
+            from .profiler import Profiler
+            profiler = Profiler()
+        checkpointer = None
+        if args.checkpoint:
+            from .checkpoint import Checkpointer
+            checkpointer = Checkpointer(
+                args.checkpoint,
+                every_steps=args.checkpoint_every,
+                every_seconds=args.checkpoint_seconds if args.checkpoint_seconds or args.checkpoint_every else 60.0,
+            )
+        result = None
+        for step in context.iter_eval(
+                absolute_identifier=absolute_identifier,
+                stats=stats,
+                profiler=profiler,
+                checkpointer=checkpointer,
+                resume=args.resume,
+        ):
+            if args.progress and step.step % args.progress == 0:
+                print('step %d, size %d' % (step.step, step.size), file=sys.stderr)
+            result = step.term
+        print_result(result, args)
+        if args.stats:
+            print(stats, file=sys.stderr)
+            if context.optimizer is not None:
+                print(context.optimizer.summary(), file=sys.stderr)
+        if args.profile:
+            print(profiler.summary(), file=sys.stderr)
+        if args.profile_output:
+            with open(str(args.profile_output), 'w') as f:
+                profiler.write_collapsed(f, args.profile_metric)
+        if memo is not None:
+            memo.save(args.memo, context.fingerprint())
 
 
 if __name__ == '__main__':
@@ -0,0 +1,304 @@
+import argparse
+import json
+import math
+import pathlib
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import typing
+
+from .context import DictContext, EvalStats
+from .optimizer import Optimizer, default_passes
+from .parser import parse_namespace
+from .printer import to_string
+
+BASELINE_PATH = pathlib.Path(__file__).parent / 'benchmark_baseline.json'
+
+
+def numeral_family(size: int) -> str:
+    """Successor of a literal numeral of `size`"""
+    return 'SUCC = λn.λf.λx.f (n f x);\nmain = SUCC (λf.λx.%sx%s);\n' % ('f (' * size, ')' * size)
+
+
+def nesting_family(size: int) -> str:
+    """Identity applied to `size` nested abstractions"""
+    binders = ''.join('λx%d.' % index for index in range(size))
+    return 'main = (λy.y) (%sx0);\n' % binders
+
+
+def spine_family(size: int) -> str:
+    """Application spine of `size` identities"""
+    return 'ID = λx.x;\nmain = %s;\n' % ' '.join(['ID'] * size)
+
+
+def definitions_family(size: int) -> str:
+    """Chain of `size` definitions referring to the previous one"""
+    lines = ['d0 = λx.x;']
+    lines.extend('d%d = d%d;' % (index, index - 1) for index in range(1, size))
+    lines.append('main = d%d;' % (size - 1))
+    return '\n'.join(lines) + '\n'
+
+
+FAMILIES: typing.Dict[str, typing.Callable[[int], str]] = {
+    'numeral': numeral_family,
+    'nesting': nesting_family,
+    'spine': spine_family,
+    'definitions': definitions_family,
+}
+
+SIZES = [16, 32, 64, 128]
+
+
+OPERATIONS = ['parse', 'eval', 'print']
+
+
+def _prepare(operation: str, source: str) -> typing.Callable[[], typing.Any]:
+    """
+    :returns: A function performing the measured operation, with everything else done in advance
+    """
+    if operation == 'parse':
+        return lambda: parse_namespace(source)
+    context = DictContext({'main': source})
+    if operation == 'eval':
+        return lambda: context.eval()
+    elif operation == 'print':
+        result = context.eval()
+        return lambda: to_string(result)
+    raise ValueError('Unknown operation %s' % operation)
+
+
+def measure(operation: str, source: str, repeats: int = 3, min_time: float = 0.005) -> typing.Tuple[float, int]:
+    """
+    Fast operations are run in a loop until it takes at least `min_time` seconds.
+    :returns: Best time of an operation over `repeats` loops in seconds
+    and peak memory allocated by an operation in bytes
+    """
+    run = _prepare(operation, source)
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            run()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        number *= 2
+    times = [elapsed / number]
+    for _ in range(repeats - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            run()
+        times.append((time.perf_counter() - started) / number)
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(times), peak
+
+
+def fit_exponent(sizes: typing.Sequence[int], values: typing.Sequence[float]) -> float:
+    """
+    Fits `value = c * size ** k` with least squares in log-log space.
+    :returns: The exponent `k`
+    """
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(value, 1e-9)) for value in values]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance
+
+
+def run(
+        sizes: typing.Sequence[int] = SIZES,
+        families: typing.Optional[typing.Iterable[str]] = None,
+        operations: typing.Sequence[str] = OPERATIONS,
+        repeats: int = 3,
+        min_time: float = 0.005,
+) -> typing.Dict[str, typing.Dict[str, float]]:
+    """
+    :returns: Time and memory growth exponents keyed by `operation/family`
+    """
+    limit = sys.getrecursionlimit()
+    # Both the parser and the model recurse on every nesting level
+    sys.setrecursionlimit(max(limit, 100 * max(sizes) + 1000))
+    try:
+        results = {}
+        for family in (families if families is not None else FAMILIES):
+            sources = [FAMILIES[family](size) for size in sizes]
+            for operation in operations:
+                measurements = [measure(operation, source, repeats, min_time) for source in sources]
+                results['%s/%s' % (operation, family)] = {
+                    'time': fit_exponent(sizes, [seconds for seconds, _ in measurements]),
+                    'memory': fit_exponent(sizes, [peak for _, peak in measurements]),
+                }
+        return results
+    finally:
+        sys.setrecursionlimit(limit)
+
+
+# Recursive functions of a numeral or a list of `depth` elements, as bodies referring to themselves as `rec`
+RECURSIVE_FUNCTIONS = {
+    'numeral': 'λn.prelude/ISZERO n prelude/0 (prelude/SUCC (rec (prelude/PRED n)))',
+    'list': 'λl.prelude/ISNIL l prelude/0 (prelude/SUCC (rec (prelude/TAIL l)))',
+}
+
+RECURSION_DEPTHS = [2, 4, 6, 8]
+
+
+def recursive_program(function: str, depth: int, letrec: bool) -> str:
+    """
+    Copies a numeral or counts elements of a list recursively,
+    either binding the function with `letrec` or passing it to the Y combinator
+    """
+    if function == 'numeral':
+        argument = 'λf.λx.%sx%s' % ('f (' * depth, ')' * depth)
+    else:
+        argument = '%sprelude/NIL%s' % ('prelude/CONS prelude/0 (' * depth, ')' * depth)
+    if letrec:
+        expr = 'letrec rec = %s in rec (%s)' % (RECURSIVE_FUNCTIONS[function], argument)
+    else:
+        expr = 'prelude/Y (λrec.%s) (%s)' % (RECURSIVE_FUNCTIONS[function], argument)
+    return 'import prelude;\nmain = %s;\n' % expr
+
+
+def run_recursion(
+        depths: typing.Sequence[int] = RECURSION_DEPTHS,
+        repeats: int = 3,
+) -> typing.Dict[str, typing.Dict[str, float]]:
+    """
+    :returns: Evaluation times of recursive programs using `letrec` and the Y combinator keyed by `function/depth`
+    """
+    return {
+        '%s/%d' % (function, depth): {
+            binding: measure('eval', recursive_program(function, depth, binding == 'letrec'), repeats)[0]
+            for binding in ('letrec', 'fixpoint')
+        }
+        for function in RECURSIVE_FUNCTIONS
+        for depth in depths
+    }
+
+
+def measure_steps_saved(source: str, between_rounds: bool = False) -> Optimizer:
+    """
+    Evaluates `source` with the default optimizer pipeline, then once without each of its passes.
+    :returns: Optimizer of the first evaluation, with the steps each pass saves in its report
+    """
+    def steps(optimizer: Optimizer) -> int:
+        stats = EvalStats()
+        DictContext({'main': source}, optimizer=optimizer).eval(stats=stats)
+        return stats.steps
+
+    optimizer = Optimizer(between_rounds=between_rounds)
+    optimized_steps = steps(optimizer)
+    for name, report in optimizer.report.items():
+        passes = [optimization_pass for optimization_pass in default_passes() if optimization_pass.name != name]
+        report.steps_saved = steps(Optimizer(passes, between_rounds=between_rounds)) - optimized_steps
+    return optimizer
+
+
+STARTUP_PROGRAM = 'import prelude;\nmain = prelude/SUCC prelude/2;\n'
+
+
+def measure_startup(arguments: typing.Sequence[str], repeats: int = 3) -> float:
+    """
+    :returns: Best wall time of `python -m lcalc` with `arguments` in seconds
+    """
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, '-m', 'lcalc'] + list(arguments),
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def run_startup(repeats: int = 3) -> typing.Dict[str, float]:
+    """
+    :returns: Start-up times of the CLI printing help and evaluating a program importing the prelude
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = pathlib.Path(directory) / 'main.lcalc'
+        with open(str(path), 'w', encoding='utf-8') as f:
+            f.write(STARTUP_PROGRAM)
+        return {
+            'help': measure_startup(['--help'], repeats),
+            'prelude': measure_startup([str(path)], repeats),
+        }
+
+
+def compare(
+        results: typing.Dict[str, typing.Dict[str, float]],
+        baseline: typing.Dict[str, typing.Dict[str, float]],
+        tolerance: float = 0.35,
+) -> typing.List[str]:
+    """
+    :returns: Descriptions of growth exponents exceeding the baseline ones by more than `tolerance`
+    """
+    regressions = []
+    for name, exponents in sorted(results.items()):
+        for metric, exponent in sorted(exponents.items()):
+            expected = baseline.get(name, {}).get(metric)
+            if expected is not None and exponent > expected + tolerance:
+                regressions.append('%s %s grows as n^%.2f, baseline is n^%.2f' % (name, metric, exponent, expected))
+    return regressions
+
+
+def main():
+    argument_parser = argparse.ArgumentParser(description='Detect regressions in asymptotic complexity')
+    argument_parser.add_argument('--baseline', action='store', type=pathlib.Path, default=BASELINE_PATH)
+    argument_parser.add_argument('--update', action='store_true', help='Store measured exponents as the baseline')
+    argument_parser.add_argument('--tolerance', action='store', type=float, default=0.35)
+    argument_parser.add_argument('--repeats', action='store', type=int, default=3)
+    argument_parser.add_argument('--sizes', action='store', type=int, nargs='+', default=SIZES)
+    argument_parser.add_argument('--startup', action='store_true', help='Measure start-up time of the CLI instead')
+    argument_parser.add_argument('--recursion', action='store_true', help='Compare letrec with the Y combinator instead')
+    argument_parser.add_argument('--passes', action='store', type=pathlib.Path, help='Report the steps each optimizer pass saves evaluating this program instead')
+    args = argument_parser.parse_args()
+
+    if args.passes:
+        print(measure_steps_saved(args.passes.read_text(encoding='utf-8')).summary())
+        return
+
+    if args.recursion:
+        for name, times in sorted(run_recursion(repeats=args.repeats).items()):
+            print('%-12s letrec %.4fs  fixpoint %.4fs  speedup %.2f' % (
+                name, times['letrec'], times['fixpoint'], times['fixpoint'] / times['letrec'],
+            ))
+        return
+
+    if args.startup:
+        # Absolute times depend on the machine, so there is no baseline to compare them with
+        for name, seconds in sorted(run_startup(args.repeats).items()):
+            print('startup/%-12s %.3fs' % (name, seconds))
+        return
+
+    results = run(sizes=args.sizes, repeats=args.repeats)
+    for name, exponents in sorted(results.items()):
+        print('%-20s time n^%.2f  memory n^%.2f' % (name, exponents['time'], exponents['memory']))
+    if args.update:
+        with open(str(args.baseline), 'w') as f:
+            # Constant costs may fit slightly negative exponents because of noise
+            json.dump({
+                name: {metric: round(max(exponent, 0.0), 2) for metric, exponent in exponents.items()}
+                for name, exponents in results.items()
+            }, f, indent=2, sort_keys=True)
+            f.write('\n')
+        return
+    with open(str(args.baseline)) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print('REGRESSION: %s' % regression, file=sys.stderr)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
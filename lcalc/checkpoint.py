@@ -0,0 +1,128 @@
+"""
+Checkpoints of a running evaluation.
+
+A checkpoint is a serialized term file (see `serialization`) holding the current term
+labeled with a JSON header: format version, fingerprint of the context,
+evaluated entry point and evaluation statistics so far.
+"""
+import json
+import logging
+import os
+import pathlib
+import time
+import typing
+
+from .model import Def
+from .serialization import MappedTerms, SerializationError, dumps
+
+VERSION = 1
+
+
+class CheckpointError(Exception):
+    pass
+
+
+class Checkpoint(object):
+    def __init__(self, expr: Def, entry_point: str, fingerprint: str, steps: int, memo_hits: int = 0, memo_misses: int = 0):
+        self.expr = expr
+        self.entry_point = entry_point
+        self.fingerprint = fingerprint
+        self.steps = steps
+        self.memo_hits = memo_hits
+        self.memo_misses = memo_misses
+
+    def save(self, path: pathlib.Path):
+        """
+        Writes the checkpoint to a temporary file first, so `path` always holds a complete checkpoint
+        """
+        header = json.dumps({
+            'version': VERSION,
+            'entry_point': self.entry_point,
+            'fingerprint': self.fingerprint,
+            'steps': self.steps,
+            'memo_hits': self.memo_hits,
+            'memo_misses': self.memo_misses,
+        }, sort_keys=True)
+        temporary_path = path.with_name(path.name + '.tmp')
+        with open(str(temporary_path), 'wb') as f:
+            f.write(dumps([self.expr], labels=[header]))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(str(temporary_path), str(path))
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> 'Checkpoint':
+        """
+        :raises CheckpointError: if the file is not a checkpoint of a supported version
+        """
+        try:
+            with MappedTerms(path) as terms:
+                if len(terms) != 1:
+                    raise ValueError('expected a single term, got %d' % len(terms))
+                header = json.loads(terms.labels[0])
+                expr = terms[0]
+            if header['version'] != VERSION:
+                raise CheckpointError('Unsupported checkpoint version %s' % header['version'])
+            return cls(
+                expr,
+                entry_point=header['entry_point'],
+                fingerprint=header['fingerprint'],
+                steps=header['steps'],
+                memo_hits=header['memo_hits'],
+                memo_misses=header['memo_misses'],
+            )
+        except (SerializationError, KeyError, TypeError, ValueError) as e:
+            raise CheckpointError('%s is not a checkpoint: %s' % (path, e))
+
+
+class Checkpointer(object):
+    """
+    Saves the term being reduced to `path` every `every_steps` steps and every `every_seconds` seconds,
+    whichever comes first. Checkpoints are tied to the context they were made in with its fingerprint.
+    """
+    def __init__(
+            self,
+            path: pathlib.Path,
+            every_steps: typing.Optional[int] = None,
+            every_seconds: typing.Optional[float] = None,
+    ):
+        self.path = path
+        self._every_steps = every_steps
+        self._every_seconds = every_seconds
+        self._entry_point: typing.Optional[str] = None
+        self._fingerprint: typing.Optional[str] = None
+        self._last_steps = 0
+        self._last_time = 0.0
+        self.saved = 0
+
+    def start(self, context, entry_point: str, steps: int = 0):
+        self._entry_point = entry_point
+        self._fingerprint = context.fingerprint()
+        self._last_steps = steps
+        self._last_time = time.monotonic()
+
+    def due(self, steps: int) -> bool:
+        if self._every_steps is not None and steps - self._last_steps >= self._every_steps:
+            return True
+        return self._every_seconds is not None and time.monotonic() - self._last_time >= self._every_seconds
+
+    def save(self, expr: Def, steps: int, memo_hits: int = 0, memo_misses: int = 0):
+        Checkpoint(expr, self._entry_point, self._fingerprint, steps, memo_hits, memo_misses).save(self.path)
+        self._last_steps = steps
+        self._last_time = time.monotonic()
+        self.saved += 1
+
+    def resume(self, context, entry_point: str) -> typing.Optional[Checkpoint]:
+        """
+        :returns: The saved checkpoint, or None if there is none yet
+        :raises CheckpointError: if the checkpoint was made for other definitions or another entry point
+        """
+        if not self.path.exists():
+            logging.warning('No checkpoint %s, starting from scratch' % self.path)
+            return None
+        checkpoint = Checkpoint.load(self.path)
+        if checkpoint.fingerprint != context.fingerprint():
+            raise CheckpointError('Checkpoint %s was made for other definitions' % self.path)
+        if checkpoint.entry_point != entry_point:
+            raise CheckpointError('Checkpoint %s was made for %s, not %s' % (self.path, checkpoint.entry_point, entry_point))
+        return checkpoint
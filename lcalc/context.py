@@ -1,21 +1,298 @@
+import copy
+import types
 import typing
+import hashlib
 import logging
 import pathlib
 
-from .identifiers import NamespaceIdentifier, AbsoluteIdentifier
+from .identifiers import NamespaceIdentifier, RelativeIdentifier, AbsoluteIdentifier
 from .model import Def
-from .parser import Namespace, parse_namespace
+from .namespace import Namespace
+
+if typing.TYPE_CHECKING:
+    # Only needed for annotations, importing them here would slow down start-up
+    from .memo import NormalFormMemo, FrozenMemo
+    from .profiler import Profiler
+    from .optimizer import Optimizer
+    from .checkpoint import Checkpointer
+
+
+class StepLimitExceeded(Exception):
+    def __init__(self, expr: Def, steps: int):
+        super(StepLimitExceeded, self).__init__('Normal form was not reached in %d steps' % steps)
+        self.expr = expr
+        self.steps = steps
+
+
+class SizeLimitExceeded(Exception):
+    def __init__(self, expr: Def, steps: int):
+        super(SizeLimitExceeded, self).__init__('Expression grew to %d nodes in %d steps' % (expr.size, steps))
+        self.expr = expr
+        self.steps = steps
+
+
+class EvalStats(object):
+    def __init__(self):
+        self.steps = 0
+        self.memo_hits = 0
+        self.memo_misses = 0
+
+    @property
+    def memo_hit_ratio(self) -> float:
+        lookups = self.memo_hits + self.memo_misses
+        return self.memo_hits / lookups if lookups else 0.0
+
+    def __str__(self):
+        return 'steps: %d, memo hits: %d, memo misses: %d, memo hit ratio: %.2f' % (
+            self.steps, self.memo_hits, self.memo_misses, self.memo_hit_ratio,
+        )
+
+
+class EvalStep(object):
+    """
+    Record of a reduction round. The term is not rendered unless asked to.
+    """
+    def __init__(self, step: int, term: Def):
+        self.step = step
+        self.term = term
+
+    @property
+    def size(self) -> int:
+        return self.term.size
+
+    def __repr__(self):
+        return '<EvalStep %d, size %d>' % (self.step, self.size)
+
+
+def _strongly_connected_components(
+        graph: typing.Dict[AbsoluteIdentifier, typing.Set[AbsoluteIdentifier]]
+) -> typing.List[typing.List[AbsoluteIdentifier]]:
+    """
+    Iterative Tarjan's algorithm.
+    :returns: Components in reverse topological order, i.e. dependencies go first
+    """
+    index: typing.Dict[AbsoluteIdentifier, int] = {}
+    lowlink: typing.Dict[AbsoluteIdentifier, int] = {}
+    stack: typing.List[AbsoluteIdentifier] = []
+    on_stack: typing.Set[AbsoluteIdentifier] = set()
+    components: typing.List[typing.List[AbsoluteIdentifier]] = []
+    for root in graph:
+        if root in index:
+            continue
+        work = [(root, iter(graph[root]))]
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, successors = work[-1]
+            for successor in successors:
+                if successor not in graph:
+                    continue
+                if successor not in index:
+                    index[successor] = lowlink[successor] = len(index)
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(graph[successor])))
+                    break
+                elif successor in on_stack:
+                    lowlink[node] = min(lowlink[node], index[successor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
 
 
 class Context(object):
-    def __init__(self, namespaces: typing.Dict[NamespaceIdentifier, Namespace]):
+    profiler: typing.Optional['Profiler'] = None
+
+    def __init__(
+            self,
+            namespaces: typing.Dict[NamespaceIdentifier, Namespace],
+            prenormalize: bool = False,
+            prenormalize_steps: int = 1000,
+            prenormalize_size: int = 10000,
+            memo: typing.Optional[typing.Union['NormalFormMemo', 'FrozenMemo']] = None,
+            optimizer: typing.Optional['Optimizer'] = None,
+    ):
+        """
+        :param prenormalize: Whether to reduce top-level definitions to their normal forms at link time
+        :param prenormalize_steps: Maximum number of reduction steps spent on a single definition
+        :param prenormalize_size: Maximum number of nodes a definition may grow to while being prenormalized
+        :param memo: Table of known normal forms of closed expressions, consulted before reducing them
+        :param optimizer: Optimizer to run on top-level definitions at link time,
+        and between reduction steps if it is created with `between_rounds`
+        """
         self._namespaces = namespaces
+        self.memo = memo
+        self.optimizer = optimizer
+        self._prenormalize = prenormalize
+        self._prenormalize_steps = prenormalize_steps
+        self._prenormalize_size = prenormalize_size
         self.link()
+        if optimizer is not None:
+            self.optimize()
+        if prenormalize:
+            self.prenormalize(prenormalize_steps, max_size=prenormalize_size)
 
     def link(self):
         for namespace_name, namespace in self._namespaces.items():
             namespace.link(namespace_name)
 
+    def definitions(self) -> typing.Dict[AbsoluteIdentifier, Def]:
+        """
+        :returns: Bodies of all top-level definitions, pre-normalized where available
+        """
+        return {
+            AbsoluteIdentifier(namespace_identifier, relative_identifier):
+                namespace.get_def(relative_identifier)
+            for namespace_identifier, namespace in self._namespaces.items()
+            for relative_identifier in namespace.relative_identifiers
+        }
+
+    def dependency_graph(self) -> typing.Dict[AbsoluteIdentifier, typing.Set[AbsoluteIdentifier]]:
+        """
+        :returns: Mapping from each top-level definition to the definitions it refers to
+        """
+        return {
+            AbsoluteIdentifier(namespace_identifier, relative_identifier):
+                namespace.get_source_def(relative_identifier).global_references()
+            for namespace_identifier, namespace in self._namespaces.items()
+            for relative_identifier in namespace.relative_identifiers
+        }
+
+    def fingerprint(self) -> str:
+        """
+        :returns: Digest of all source definitions, stable between runs
+        """
+        digest = hashlib.sha256()
+        for absolute_identifier in sorted(self.dependency_graph(), key=str):
+            namespace = self.get_namespace(absolute_identifier.namespace_identifier)
+            expr = namespace.get_source_def(absolute_identifier.relative_identifier)
+            digest.update(('%s=%d;' % (absolute_identifier, hash(expr))).encode('utf-8'))
+        return digest.hexdigest()
+
+    def recursive_definitions(self) -> typing.Set[AbsoluteIdentifier]:
+        """
+        :returns: Definitions referring to themselves, directly or through other definitions
+        """
+        graph = self.dependency_graph()
+        return {
+            absolute_identifier
+            for component in _strongly_connected_components(graph)
+            if len(component) > 1 or component[0] in graph[component[0]]
+            for absolute_identifier in component
+        }
+
+    def import_graph(self) -> typing.Dict[NamespaceIdentifier, typing.Set[NamespaceIdentifier]]:
+        """
+        :returns: Mapping from each namespace to the namespaces it imports
+        """
+        return {
+            namespace_identifier: {
+                import_statement.identifier
+                for import_statement in namespace.import_statements
+            }
+            for namespace_identifier, namespace in self._namespaces.items()
+        }
+
+    def dependents(
+            self,
+            namespace_identifiers: typing.Iterable[NamespaceIdentifier],
+    ) -> typing.Set[NamespaceIdentifier]:
+        """
+        :returns: Given namespaces and all the namespaces importing them, directly or transitively
+        """
+        importers: typing.Dict[NamespaceIdentifier, typing.Set[NamespaceIdentifier]] = {}
+        for importer, imported in self.import_graph().items():
+            for namespace_identifier in imported:
+                importers.setdefault(namespace_identifier, set()).add(importer)
+        result = set(namespace_identifiers)
+        to_visit = list(result)
+        while to_visit:
+            for importer in importers.get(to_visit.pop(), ()):
+                if importer not in result:
+                    result.add(importer)
+                    to_visit.append(importer)
+        return result
+
+    def invalidate(self, namespace_identifiers: typing.Iterable[NamespaceIdentifier]):
+        """
+        Drops pre-normalized bodies of the given namespaces and of the namespaces depending on them,
+        prenormalizing them again if the context was created with `prenormalize`.
+        Known normal forms may refer to the changed definitions, so the memo table is cleared.
+        """
+        affected = self.dependents(namespace_identifiers)
+        for namespace_identifier in affected:
+            self.get_namespace(namespace_identifier).clear_normalized()
+        if self.memo is not None:
+            self.memo.clear()
+        if self.optimizer is not None:
+            self.optimizer.reset()
+            self.optimize(affected)
+        if self._prenormalize:
+            self.prenormalize(self._prenormalize_steps, affected, max_size=self._prenormalize_size)
+
+    def optimize(self, namespace_identifiers: typing.Optional[typing.Set[NamespaceIdentifier]] = None):
+        """
+        Replaces bodies of top-level definitions with their optimized versions
+        :param namespace_identifiers: Only definitions of these namespaces are optimized if given
+        """
+        for namespace_identifier, namespace in self._namespaces.items():
+            if namespace_identifiers is not None and namespace_identifier not in namespace_identifiers:
+                continue
+            for relative_identifier in namespace.relative_identifiers:
+                namespace.set_normalized(
+                    relative_identifier,
+                    self.optimizer.run(namespace.get_def(relative_identifier), self),
+                )
+
+    def prenormalize(
+            self,
+            max_steps: int = 1000,
+            namespace_identifiers: typing.Optional[typing.Set[NamespaceIdentifier]] = None,
+            max_size: typing.Optional[int] = 10000,
+    ):
+        """
+        Replaces bodies of top-level definitions with their normal forms.
+        Definitions are processed dependencies first, so the bodies unfolded during
+        normalization are already reduced.
+        Recursive definitions, definitions referring to undefined identifiers
+        and definitions not reaching normal form in `max_steps` steps
+        (or growing beyond `max_size` nodes or too deep to be reduced) are left untouched.
+        :param namespace_identifiers: Only definitions of these namespaces are prenormalized if given
+        """
+        graph = self.dependency_graph()
+        for component in _strongly_connected_components(graph):
+            if len(component) > 1 or component[0] in graph[component[0]]:
+                logging.debug('Not prenormalizing recursive %s' % component)
+                continue
+            absolute_identifier = component[0]
+            if namespace_identifiers is not None and \
+                    absolute_identifier.namespace_identifier not in namespace_identifiers:
+                continue
+            if not all(reference in graph for reference in graph[absolute_identifier]):
+                continue
+            try:
+                expr = self.normalize(self.get_def(absolute_identifier), max_steps=max_steps, max_size=max_size)
+            except (StepLimitExceeded, SizeLimitExceeded, RecursionError):
+                logging.debug('Not prenormalizing non-terminating %s' % absolute_identifier)
+                continue
+            self.get_namespace(absolute_identifier.namespace_identifier).set_normalized(
+                absolute_identifier.relative_identifier,
+                expr,
+            )
+
     def get_namespace(self, namespace_identifier: NamespaceIdentifier):
         if namespace_identifier in self._namespaces:
             return self._namespaces[namespace_identifier]
@@ -26,40 +303,319 @@ class Context(object):
         namespace = self.get_namespace(absolute_identifier.namespace_identifier)
         return namespace.get_def(absolute_identifier.relative_identifier)
 
-    def eval(self, absolute_identifier: AbsoluteIdentifier):
-        expr = self.get_def(absolute_identifier)
+    def freeze(self) -> 'FrozenContext':
+        """
+        :returns: An immutable snapshot of the context, see `FrozenContext`
+        """
+        return FrozenContext(self)
+
+    def iter_normalize(
+            self,
+            expr: Def,
+            max_steps: typing.Optional[int] = None,
+            stats: typing.Optional[EvalStats] = None,
+            checkpointer: typing.Optional['Checkpointer'] = None,
+            max_size: typing.Optional[int] = None,
+    ) -> typing.Iterator[EvalStep]:
+        """
+        Reduces the expression round by round, yielding a record after each round.
+        The last record holds the normal form. Stopping the iteration early leaves the counters
+        of the rounds made so far in `stats`.
+        :param stats: Statistics to add the counters of this normalization to
+        :param checkpointer: Checkpointer to save the current expression with when it is due
+        :raises StepLimitExceeded: if normal form is not reached in `max_steps` steps
+        :raises SizeLimitExceeded: if the expression grows beyond `max_size` nodes
+        """
+        if stats is None:
+            stats = EvalStats()
+        if self.memo is not None:
+            hits, misses = self.memo.hits, self.memo.misses
+        source = expr
         old: typing.Optional[Def] = None
-        while expr != old:
-            old = expr
-            expr = expr.beta(self)
+        steps = 0
+        try:
+            while expr != old:
+                if max_steps is not None and steps >= max_steps:
+                    raise StepLimitExceeded(expr, steps)
+                old = expr
+                expr = expr.beta(self)
+                steps += 1
+                if max_size is not None and expr.size > max_size:
+                    raise SizeLimitExceeded(expr, steps)
+                if self.optimizer is not None and self.optimizer.between_rounds:
+                    expr = self.optimizer.run(expr, self, between_rounds=True)
+                if self.profiler is not None:
+                    self.profiler.end_round(expr, old._origin or ())
+                if checkpointer is not None and checkpointer.due(stats.steps + steps):
+                    if self.memo is not None:
+                        checkpointer.save(
+                            expr,
+                            stats.steps + steps,
+                            stats.memo_hits + self.memo.hits - hits,
+                            stats.memo_misses + self.memo.misses - misses,
+                        )
+                    else:
+                        checkpointer.save(expr, stats.steps + steps, stats.memo_hits, stats.memo_misses)
+                yield EvalStep(stats.steps + steps, expr)
+        finally:
+            stats.steps += steps
+            if self.memo is not None:
+                stats.memo_hits += self.memo.hits - hits
+                stats.memo_misses += self.memo.misses - misses
+        if self.memo is not None:
+            self.memo.put(source, expr)
+
+    def normalize(
+            self,
+            expr: Def,
+            max_steps: typing.Optional[int] = None,
+            stats: typing.Optional[EvalStats] = None,
+            checkpointer: typing.Optional['Checkpointer'] = None,
+            max_size: typing.Optional[int] = None,
+    ) -> Def:
+        """
+        See `iter_normalize`
+        :returns: The normal form of the expression
+        """
+        for step in self.iter_normalize(expr, max_steps=max_steps, stats=stats, checkpointer=checkpointer, max_size=max_size):
+            expr = step.term
+        return expr
+
+    def iter_eval(
+            self,
+            absolute_identifier: AbsoluteIdentifier = AbsoluteIdentifier(NamespaceIdentifier('main'), RelativeIdentifier('main')),
+            stats: typing.Optional[EvalStats] = None,
+            profiler: typing.Optional['Profiler'] = None,
+            checkpointer: typing.Optional['Checkpointer'] = None,
+            resume: bool = False,
+    ) -> typing.Iterator[EvalStep]:
+        """
+        Normalizes the definition round by round, see `iter_normalize`
+        :param profiler: Profiler to attribute the cost of the evaluation to definitions with
+        :param checkpointer: Checkpointer to periodically save the expression being reduced with
+        :param resume: Whether to continue from the checkpoint saved by `checkpointer`, if there is one
+        :raises CheckpointError: if the checkpoint to resume from was made for other definitions
+        """
+        if stats is None:
+            stats = EvalStats()
+        expr = self.get_def(absolute_identifier)
+        if checkpointer is not None:
+            checkpoint = checkpointer.resume(self, str(absolute_identifier)) if resume else None
+            if checkpoint is not None:
+                expr = checkpoint.expr
+                stats.steps += checkpoint.steps
+                stats.memo_hits += checkpoint.memo_hits
+                stats.memo_misses += checkpoint.memo_misses
+            checkpointer.start(self, str(absolute_identifier), stats.steps)
+        if profiler is None:
+            context = self
+        else:
+            context = copy.copy(self)
+            context.profiler = profiler
+            expr = profiler.start(expr, str(absolute_identifier))
+        yield from context.iter_normalize(expr, stats=stats, checkpointer=checkpointer)
+
+    def eval(
+            self,
+            absolute_identifier: AbsoluteIdentifier = AbsoluteIdentifier(NamespaceIdentifier('main'), RelativeIdentifier('main')),
+            **kwargs
+    ) -> Def:
+        """
+        See `iter_eval` for keyword arguments
+        :returns: The normal form of the definition
+        """
+        expr = None
+        for step in self.iter_eval(absolute_identifier, **kwargs):
+            expr = step.term
+        return expr
+
+
+class FrozenContext(Context):
+    """
+    Immutable snapshot of a linked context, which can be evaluated in from many threads at once.
+
+    Namespaces, definitions and the memo table are copied into read-only mappings sharing
+    the expressions of the original context, so reading them takes no locks.
+    Evaluation does not write to any shared state but the caches of expressions,
+    like unrolled `Fix` nodes, which are idempotent single attribute stores.
+    Changes to the original context, e.g. by `FSContext.refresh`, need a new snapshot.
+    """
+    def __init__(self, context: Context):
+        if context.optimizer is not None and context.optimizer.between_rounds:
+            raise Exception(
+                'Contexts optimizing between rounds can not be frozen, as passes collect statistics while running'
+            )
+        self._namespaces = types.MappingProxyType({
+            namespace_identifier: namespace.freeze()
+            for namespace_identifier, namespace in context._namespaces.items()
+        })
+        self._definitions = types.MappingProxyType(context.definitions())
+        self.memo = context.memo.freeze() if context.memo is not None else None
+        self.optimizer = None
+        self._prenormalize = False
+        self._prenormalize_steps = context._prenormalize_steps
+        self._prenormalize_size = context._prenormalize_size
+
+    def link(self):
+        raise Exception('Frozen context can not be linked again')
+
+    def invalidate(self, namespace_identifiers: typing.Iterable[NamespaceIdentifier]):
+        raise Exception('Frozen context can not be changed')
+
+    def optimize(self, namespace_identifiers: typing.Optional[typing.Set[NamespaceIdentifier]] = None):
+        raise Exception('Frozen context can not be changed')
+
+    def prenormalize(
+            self,
+            max_steps: int = 1000,
+            namespace_identifiers: typing.Optional[typing.Set[NamespaceIdentifier]] = None,
+            max_size: typing.Optional[int] = 10000,
+    ):
+        raise Exception('Frozen context can not be changed')
+
+    def definitions(self) -> typing.Dict[AbsoluteIdentifier, Def]:
+        return dict(self._definitions)
+
+    def get_def(self, absolute_identifier: AbsoluteIdentifier) -> Def:
+        expr = self._definitions.get(absolute_identifier)
+        if expr is None:
+            # Reports the missing namespace or definition
+            return super(FrozenContext, self).get_def(absolute_identifier)
         return expr
 
+    def freeze(self) -> 'FrozenContext':
+        return self
+
 
 class DictContext(Context):
-    def __init__(self, sources: typing.Optional[typing.Dict[str, str]]=None):
-        super(DictContext, self).__init__({
+    def __init__(self, sources: typing.Optional[typing.Dict[str, str]]=None, **kwargs):
+        from .parser import parse_namespace
+        from .prelude import PRELUDE, load_prelude
+        namespaces = {
             NamespaceIdentifier(namespace_name): parse_namespace(namespace_source)
             for namespace_name, namespace_source in sources.items()
-        } if sources is not None else {})
+        } if sources is not None else {}
+        if PRELUDE not in namespaces and any(
+                import_statement.identifier == PRELUDE
+                for namespace in namespaces.values()
+                for import_statement in namespace.import_statements
+        ):
+            namespaces[PRELUDE] = load_prelude()
+        super(DictContext, self).__init__(namespaces, **kwargs)
+
+
+class _SourceState(object):
+    def __init__(self, path: pathlib.Path, mtime: float, digest: str):
+        self.path = path
+        self.mtime = mtime
+        self.digest = digest
 
 
 class FSContext(Context):
-    def __init__(self, namespace_identifier: NamespaceIdentifier, root_path: pathlib.Path = pathlib.Path('.')):
+    def __init__(self, namespace_identifier: NamespaceIdentifier, root_path: pathlib.Path = pathlib.Path('.'), **kwargs):
         self._root_path = root_path
+        self._sources: typing.Dict[NamespaceIdentifier, _SourceState] = {}
         namespaces = {}
-        to_load = {namespace_identifier}
+        self._load_imports(namespaces, {namespace_identifier}, self._sources)
+        super(FSContext, self).__init__(namespaces, **kwargs)
+
+    def _load_imports(
+            self,
+            namespaces: typing.Dict[NamespaceIdentifier, Namespace],
+            to_load: typing.Set[NamespaceIdentifier],
+            sources: typing.Dict[NamespaceIdentifier, _SourceState],
+    ) -> typing.Set[NamespaceIdentifier]:
+        """
+        Loads given namespaces and everything they import, skipping the ones already in `namespaces`
+        :param sources: Source files of newly loaded namespaces are recorded here
+        :returns: Identifiers of newly loaded namespaces
+        """
+        loaded = set()
         while to_load:
             namespace_identifier = to_load.pop()
-            namespace = self._load_namespace(namespace_identifier)
+            namespace = self._load_namespace(namespace_identifier, sources)
             namespaces[namespace_identifier] = namespace
+            loaded.add(namespace_identifier)
             for import_statement in namespace.import_statements:
                 if import_statement.identifier not in namespaces:
                     to_load.add(import_statement.identifier)
-        super(FSContext, self).__init__(namespaces)
+        return loaded
 
-    def _load_namespace(self, namespace_identifier: NamespaceIdentifier) -> Namespace:
+    def _load_namespace(
+            self,
+            namespace_identifier: NamespaceIdentifier,
+            sources: typing.Dict[NamespaceIdentifier, _SourceState],
+    ) -> Namespace:
+        """
+        The `prelude` namespace is loaded from the bundled snapshot unless there is a `prelude.lcalc` file
+        """
+        from .prelude import PRELUDE, SNAPSHOT_PATH, load_prelude
         logging.debug('Loading %s' % namespace_identifier)
-        path = self._root_path / f'{namespace_identifier._value}.lcalc'
-        with open(str(path.absolute())) as f:
-            source = f.read()
-            return parse_namespace(source)
+        path = (self._root_path / f'{namespace_identifier._value}.lcalc').absolute()
+        bundled = namespace_identifier == PRELUDE and not path.exists()
+        if bundled:
+            path = SNAPSHOT_PATH
+        mtime = path.stat().st_mtime
+        with open(str(path), 'rb') as f:
+            data = f.read()
+        sources[namespace_identifier] = _SourceState(path, mtime, hashlib.sha256(data).hexdigest())
+        if bundled:
+            return load_prelude()
+        from .parser import parse_namespace
+        return parse_namespace(data.decode('utf-8'))
+
+    def _is_changed(self, namespace_identifier: NamespaceIdentifier) -> bool:
+        """
+        The recorded mtime is only updated here when the content is unchanged,
+        otherwise it is replaced together with the digest once the namespace is reloaded
+        """
+        state = self._sources[namespace_identifier]
+        mtime = state.path.stat().st_mtime
+        if mtime == state.mtime:
+            return False
+        with open(str(state.path), 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        if digest == state.digest:
+            state.mtime = mtime
+            return False
+        return True
+
+    @property
+    def source_digests(self) -> typing.Dict[NamespaceIdentifier, str]:
+        """
+        :returns: SHA-256 of the source file of each loaded namespace
+        """
+        return {
+            namespace_identifier: state.digest
+            for namespace_identifier, state in self._sources.items()
+        }
+
+    def refresh(self) -> typing.Set[NamespaceIdentifier]:
+        """
+        Re-parses namespaces whose source files were changed since they were loaded,
+        loads namespaces they started to import, and invalidates everything depending on them.
+        Files are only read when their mtime changes, and only re-parsed when their content changes.
+        If a changed file fails to load, the previously loaded namespaces are kept
+        and the file is retried on the next refresh.
+        :returns: Identifiers of changed and newly loaded namespaces
+        """
+        changed = {
+            namespace_identifier
+            for namespace_identifier in list(self._sources)
+            if self._is_changed(namespace_identifier)
+        }
+        if not changed:
+            return changed
+        namespaces = {
+            namespace_identifier: namespace
+            for namespace_identifier, namespace in self._namespaces.items()
+            if namespace_identifier not in changed
+        }
+        sources = {}
+        changed = self._load_imports(namespaces, changed, sources)
+        for namespace_identifier in changed:
+            namespaces[namespace_identifier].link(namespace_identifier)
+        self._sources.update(sources)
+        self._namespaces = namespaces
+        self.invalidate(changed)
+        return changed
@@ -48,7 +48,7 @@ class AbsoluteIdentifier(Identifier):
     def __eq__(self, other):
         if not isinstance(other, self.__class__):
             return False
-        return self._namespace_identifier == other._namespace_identifier and self._relative_identifier == other._namespace_identifier
+        return self._namespace_identifier == other._namespace_identifier and self._relative_identifier == other._relative_identifier
 
     def __hash__(self):
         return hash((self._namespace_identifier, self._relative_identifier))
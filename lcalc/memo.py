@@ -0,0 +1,173 @@
+import collections
+import json
+import logging
+import pathlib
+import threading
+import types
+import typing
+
+from .model import Def
+from .serialization import MappedTerms, SerializationError, dumps
+
+# Version of the memo file format, saved in the label of its first term
+VERSION = 1
+
+
+class NormalFormMemo(object):
+    """
+    Bounded table mapping closed expressions to their normal forms.
+    Expressions are compared structurally, so alpha-equivalent expressions share an entry.
+    The least recently used entry is evicted when the table is full.
+
+    Besides the normal forms of whole evaluated expressions, the table records normal forms
+    of closed subterms: a closed subterm missing from the table is tracked through the rounds
+    of reduction, see `reduced`, and stored once it stops changing.
+
+    Expressions refer to top-level definitions by name, so a table is only valid
+    for the context it was filled by; `save` and `load` check this with a context fingerprint.
+    """
+    def __init__(self, max_size: int = 10000):
+        self._max_size = max_size
+        self._table: typing.OrderedDict[Def, Def] = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Replaced when the table is cleared, so expressions tracked before that are not stored
+        self._generation = object()
+
+    def __len__(self):
+        return len(self._table)
+
+    def get(self, expr: Def) -> typing.Optional[Def]:
+        normal_form = self._table.get(expr)
+        if normal_form is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._table.move_to_end(expr)
+        return normal_form
+
+    def source(self, expr: Def) -> typing.Optional[Def]:
+        """
+        :returns: The closed expression `expr` was reduced from, if it is tracked by this table
+        """
+        tracked = expr._memo_source
+        if tracked is not None and tracked[0] is self._generation:
+            return tracked[1]
+        return None
+
+    def reduced(self, source: Def, expr: Def, result: Def):
+        """
+        Records a round of reduction of `expr`, reduced from `source`, to `result`.
+        `result` is tracked as reduced from `source` too, unless it is `expr` itself:
+        then the expression is in normal form and it is stored as the normal form of `source`.
+        """
+        if result is expr:
+            expr._memo_source = None
+            if source is not expr:
+                self.put(source, expr)
+        else:
+            result._memo_source = (self._generation, source)
+
+    def clear(self):
+        self._table.clear()
+        self._generation = object()
+
+    def put(self, expr: Def, normal_form: Def):
+        if expr.free_bound != 0 or self._max_size <= 0:
+            return
+        self._table[expr] = normal_form
+        self._table.move_to_end(expr)
+        while len(self._table) > self._max_size:
+            self._table.popitem(last=False)
+
+    def freeze(self) -> 'FrozenMemo':
+        return FrozenMemo(self)
+
+    def save(self, path: pathlib.Path, fingerprint: str):
+        _save(self._table, path, fingerprint)
+
+    def load(self, path: pathlib.Path, fingerprint: str) -> bool:
+        """
+        Adds entries saved to `path` by a context with the same fingerprint.
+        :returns: Whether the entries were loaded
+        """
+        if not path.exists():
+            return False
+        try:
+            with MappedTerms(path) as terms:
+                if len(terms) == 0:
+                    return False
+                header = json.loads(terms.labels[0])
+                if header['version'] != VERSION:
+                    logging.warning('Ignoring %s saved in memo format %s' % (path, header['version']))
+                    return False
+                if header['fingerprint'] != fingerprint:
+                    logging.debug('Ignoring %s saved for other definitions' % path)
+                    return False
+                if len(terms) % 2:
+                    raise ValueError('expected pairs of terms, got %d terms' % len(terms))
+                items = [(terms[i], terms[i + 1]) for i in range(0, len(terms), 2)]
+        except (OSError, SerializationError, IndexError, KeyError, TypeError, ValueError) as e:
+            logging.warning('Ignoring %s, it is not a memo: %s' % (path, e))
+            return False
+        for expr, normal_form in items:
+            self.put(expr, normal_form)
+        return True
+
+
+class FrozenMemo(object):
+    """
+    Read-only copy of a table which can be consulted from many threads at once.
+    Lookups neither reorder nor add entries, and `hits` and `misses` are counted per thread,
+    so the table is never written to.
+    """
+    def __init__(self, memo: NormalFormMemo):
+        self._table: typing.Mapping[Def, Def] = types.MappingProxyType(dict(memo._table))
+        self._counters = threading.local()
+
+    def __len__(self):
+        return len(self._table)
+
+    @property
+    def hits(self) -> int:
+        return getattr(self._counters, 'hits', 0)
+
+    @property
+    def misses(self) -> int:
+        return getattr(self._counters, 'misses', 0)
+
+    def get(self, expr: Def) -> typing.Optional[Def]:
+        normal_form = self._table.get(expr)
+        if normal_form is None:
+            self._counters.misses = self.misses + 1
+        else:
+            self._counters.hits = self.hits + 1
+        return normal_form
+
+    def source(self, expr: Def) -> typing.Optional[Def]:
+        return None
+
+    def reduced(self, source: Def, expr: Def, result: Def):
+        pass
+
+    def put(self, expr: Def, normal_form: Def):
+        pass
+
+    def freeze(self) -> 'FrozenMemo':
+        return self
+
+    def save(self, path: pathlib.Path, fingerprint: str):
+        _save(self._table, path, fingerprint)
+
+
+def _save(table: typing.Mapping[Def, Def], path: pathlib.Path, fingerprint: str):
+    """
+    Writes the entries of `table` as alternating expressions and normal forms,
+    the first labelled with the format version and `fingerprint`
+    """
+    terms = [expr for entry in table.items() for expr in entry]
+    labels = [None] * len(terms)
+    if terms:
+        labels[0] = json.dumps({'version': VERSION, 'fingerprint': fingerprint}, sort_keys=True)
+    with open(str(path), 'wb') as f:
+        f.write(dumps(terms, labels=labels))
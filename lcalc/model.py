@@ -1,10 +1,43 @@
+import itertools
+import typing
+import zlib
+
 from .log import log
 from .identifiers import NamespaceIdentifier, AbsoluteIdentifier, RelativeIdentifier, Identifier
 
 
 class Def(object):
+    _free_bound = 0
+    _size = 1
+    # Stack of definitions the node was unfolded from, set by the profiler
+    _origin = None
+    # Locally nameless version of the node, cached by `to_locally_nameless` for closed nodes
+    _ln = None
+    # Whether the expression contains `LnFree` values, i.e. closing a binder over it may change it
+    _has_free = False
+    # Whether reducing the expression may change it, only tracked by locally nameless expressions
+    _reducible = True
+    # Generation of the memo table and the closed expression the node was reduced from, see `NormalFormMemo.reduced`
+    _memo_source = None
+
+    @property
+    def free_bound(self) -> int:
+        """
+        :returns: A number greater than the de Brujin index of any free value in the expression,
+        zero for closed expressions. Shifting and substituting values at or above it is a no-op.
+        """
+        return self._free_bound
+
+    @property
+    def size(self) -> int:
+        """
+        :returns: Number of nodes in the expression
+        """
+        return self._size
+
     def __str__(self, comment: bool = True):
-        raise NotImplementedError()
+        from .printer import to_string
+        return to_string(self, comment=comment)
 
     def __repr__(self, comment: bool = True):
         return self.__str__(comment=comment)
@@ -12,6 +45,13 @@ class Def(object):
     def __eq__(self, other):
         raise NotImplementedError()
 
+    def __hash__(self):
+        """
+        Structural hash consistent with `__eq__`, i.e. invariant under alpha-conversion.
+        It does not depend on the interpreter's hash randomization, so it is stable between runs.
+        """
+        return self._hash
+
     def link(self, namespace_identifier: NamespaceIdentifier):
         raise NotImplementedError(self.__class__.__name__)
 
@@ -41,8 +81,11 @@ class Def(object):
         """
         raise NotImplementedError(self.__class__.__name__)
 
-    def beta(self, context):
+    def beta(self, context, speculative: bool = False):
         """
+        :param speculative: Whether the expression may yet be discarded, being an argument
+        of an application whose head is not a value. Recursive bindings are not unrolled there,
+        as the branches of a conditional would otherwise unroll them before it is decided
         :rtype: Def
         """
         raise NotImplementedError(self.__class__.__name__)
@@ -50,23 +93,36 @@ class Def(object):
     def eta(self):
         """
         :rtype: Def
+        :returns: A copy of expression with all `λx.M x` subterms,
+        where `x` is not used by `M`, replaced with `M`
         """
         raise NotImplementedError(self.__class__.__name__)
 
     def bound_to(self, root_index=0):
+        """
+        :type root_index: int
+        :rtype: bool
+        :returns: Whether the expression uses values defined by `root_index` abstraction
+        """
+        raise NotImplementedError(self.__class__.__name__)
+
+    def global_references(self) -> typing.Set[AbsoluteIdentifier]:
+        """
+        :returns: Identifiers of all top-level definitions referred by the expression
+        """
         raise NotImplementedError(self.__class__.__name__)
 
 
 class GlobalRef(Def):
     def __init__(self, absolute_identifier: AbsoluteIdentifier):
         self._absolute_identifier = absolute_identifier
-
-    def __str__(self, comment: bool = True):
-        return f'{"{absref}" if comment else ""}{self._absolute_identifier}'
+        self._hash = hash((1, zlib.crc32(str(absolute_identifier).encode('utf-8'))))
 
     def __eq__(self, other):
         return isinstance(other, self.__class__) and self._absolute_identifier == other._absolute_identifier
 
+    __hash__ = Def.__hash__
+
     def link(self, namespace_identifier: NamespaceIdentifier):
         return self
 
@@ -78,21 +134,45 @@ class GlobalRef(Def):
     def substitute(self, expr, j=0):
         return self
 
+    def open(self, expr, k=0):
+        return self
+
+    def close(self, atom, k=0):
+        return self
+
     @log
-    def beta(self, context) -> Def:
-        return context.get_def(self._absolute_identifier)
+    def beta(self, context, speculative: bool = False) -> Def:
+        body = context.get_def(self._absolute_identifier)
+        if context.profiler is not None:
+            return context.profiler.unfold(self, body)
+        return body
+
+    def eta(self):
+        return self
+
+    def bound_to(self, root_index=0):
+        return False
+
+    def global_references(self) -> typing.Set[AbsoluteIdentifier]:
+        return {self._absolute_identifier}
+
+    @property
+    def absolute_identifier(self) -> AbsoluteIdentifier:
+        return self._absolute_identifier
 
 
 class LocalRef(Def):
+    _reducible = False
+
     def __init__(self, relative_identifier: RelativeIdentifier):
         self._relative_identifier = relative_identifier
-
-    def __str__(self, comment: bool = True):
-        return f'{"{locref}" if comment else ""}{self._relative_identifier}'
+        self._hash = hash((2, zlib.crc32(str(relative_identifier).encode('utf-8'))))
 
     def __eq__(self, other):
         return isinstance(other, self.__class__) and self._relative_identifier == other._relative_identifier
 
+    __hash__ = Def.__hash__
+
     def link(self, namespace_identifier: NamespaceIdentifier):
         return GlobalRef(AbsoluteIdentifier(namespace_identifier, self._relative_identifier))
 
@@ -104,23 +184,39 @@ class LocalRef(Def):
     def substitute(self, expr, j=0):
         return self
 
+    def open(self, expr, k=0):
+        return self
+
+    def close(self, atom, k=0):
+        return self
+
     @log
-    def beta(self, context):
+    def beta(self, context, speculative: bool = False):
         return self
 
+    def eta(self):
+        return self
+
+    def bound_to(self, root_index=0):
+        return False
+
+    def global_references(self) -> typing.Set[AbsoluteIdentifier]:
+        return set()
+
 
 class Val(Def):
     def __init__(self, identifier: Identifier, index: int):
         assert index >= 0
         self._identifier = identifier
         self._index = index
-
-    def __str__(self, comment: bool = True):
-        return f'{"{<-" + self._index + "}" if comment else ""}{self._identifier}'
+        self._free_bound = index + 1
+        self._hash = hash((3, index))
 
     def __eq__(self, other):
         return isinstance(other, Val) and self._index == other._index
 
+    __hash__ = Def.__hash__
+
     def link(self, namespace_identifier: NamespaceIdentifier,):
         return self
 
@@ -133,31 +229,46 @@ class Val(Def):
         return expr if self._index == j else self
 
     @log
-    def beta(self, context):
+    def beta(self, context, speculative: bool = False):
+        return self
+
+    def eta(self):
         return self
 
+    def bound_to(self, root_index=0):
+        return self._index == root_index
+
+    def global_references(self) -> typing.Set[AbsoluteIdentifier]:
+        return set()
+
 
 class Abs(Def):
     """Abstraction"""
     def __init__(self, identifier: RelativeIdentifier, body: Def):
         self._identifier: RelativeIdentifier = identifier
         self._body = body
-
-    def __str__(self, comment: bool = True):
-        return f'λ{self._identifier}.{self._body.__str__(comment=comment)}'
+        self._free_bound = max(body._free_bound - 1, 0)
+        self._size = body._size + 1
+        self._hash = hash((4, body._hash))
 
     def __eq__(self, other):
         return isinstance(other, Abs) and self._body == other._body
 
+    __hash__ = Def.__hash__
+
     def link(self, namespace_identifier):
         return Abs(self._identifier, self._body.link(namespace_identifier))
 
     @log
     def shift(self, d, c=0):
+        if self._free_bound <= c:
+            return self
         return Abs(self._identifier, self._body.shift(d, c + 1))
 
     @log
     def substitute(self, expr, j=0):
+        if self._free_bound <= j:
+            return self
         return Abs(
             self._identifier,
             self._body.substitute(
@@ -167,8 +278,28 @@ class Abs(Def):
         )
 
     @log
-    def beta(self, context):
-        return Abs(self._identifier, self._body.beta(context))
+    def beta(self, context, speculative: bool = False):
+        body = self._body.beta(context, speculative)
+        result = self if body is self._body else Abs(self._identifier, body)
+        if self._free_bound == 0 and context.memo is not None and (result is not self or not speculative):
+            source = context.memo.source(self)
+            if source is not None:
+                context.memo.reduced(source, self, result)
+        return result
+
+    def eta(self):
+        body = self._body.eta()
+        if isinstance(body, App) and isinstance(body._n, Val) and body._n._index == 0 and not body._m.bound_to(0):
+            return body._m.shift(-1)
+        if body is self._body:
+            return self
+        return Abs(self._identifier, body)
+
+    def bound_to(self, root_index=0):
+        return self._free_bound > root_index and self._body.bound_to(root_index + 1)
+
+    def global_references(self) -> typing.Set[AbsoluteIdentifier]:
+        return self._body.global_references()
 
 
 class App(Def):
@@ -181,19 +312,17 @@ class App(Def):
         super(App, self).__init__()
         self._m = m
         self._n = n
-
-    def __str__(self, comment: bool = True):
-        sm = self._m.__str__(comment=comment)
-        if isinstance(self._m, Abs):
-            sm = '(' + sm + ')'
-        sn = self._n.__str__(comment=comment)
-        if isinstance(self._n, App):
-            sn = '(' + sn + ')'
-        return f'{sm} {sn}'
+        self._free_bound = max(m._free_bound, n._free_bound)
+        self._size = m._size + n._size + 1
+        self._hash = hash((5, m._hash, n._hash))
+        # Leftmost node of the application spine
+        self._head = m._head if isinstance(m, App) else m
 
     def __eq__(self, other):
         return isinstance(other, App) and self._m == other._m and self._n == other._n
 
+    __hash__ = Def.__hash__
+
     def link(self, namespace_identifier):
         return App(
             self._m.link(namespace_identifier),
@@ -202,23 +331,501 @@ class App(Def):
 
     @log
     def shift(self, d, c=0):
+        if self._free_bound <= c:
+            return self
         return App(self._m.shift(d, c), self._n.shift(d, c))
 
     @log
     def substitute(self, expr, j=0):
+        if self._free_bound <= j:
+            return self
         return App(
             self._m.substitute(expr, j),
             self._n.substitute(expr, j)
         )
 
     @log
-    def beta(self, context):
+    def beta(self, context, speculative: bool = False):
+        if self._free_bound == 0 and context.memo is not None:
+            source = context.memo.source(self)
+            if source is None:
+                normal_form = context.memo.get(self)
+                if normal_form is not None:
+                    if context.profiler is not None:
+                        return context.profiler.reuse(self, normal_form)
+                    return normal_form
+                source = self
+            result = self._reduce(context, speculative)
+            if result is not self or not speculative:
+                context.memo.reduced(source, self, result)
+            return result
+        return self._reduce(context, speculative)
+
+    def _reduce(self, context, speculative: bool) -> Def:
         if isinstance(self._m, Abs):
-            return self._m._body.substitute(
-                expr=self._n.shift(1)
-            ).shift(-1)
-        else:
-            return App(
-                self._m.beta(context),
-                self._n.beta(context)
+            if context.profiler is not None:
+                return context.profiler.contract(self)
+            return self.contract()
+        elif isinstance(self._m, Fix) and not speculative:
+            if context.profiler is not None:
+                return App(context.profiler.unroll(self._m), self._n.beta(context, True))
+            return App(self._m.unroll(), self._n.beta(context, True))
+        m = self._m.beta(context, speculative)
+        n = self._n.beta(context, speculative or not isinstance(self._head, (Val, LocalRef)))
+        if m is self._m and n is self._n:
+            return self
+        return App(m, n)
+
+    def contract(self) -> Def:
+        """
+        :returns: Result of β-reduction of the redex, which requires `_m` to be an abstraction
+        """
+        return self._m._body.substitute(
+            expr=self._n.shift(1)
+        ).shift(-1)
+
+    def eta(self):
+        m = self._m.eta()
+        n = self._n.eta()
+        if m is self._m and n is self._n:
+            return self
+        return App(m, n)
+
+    def bound_to(self, root_index=0):
+        return self._free_bound > root_index and (self._m.bound_to(root_index) or self._n.bound_to(root_index))
+
+    def global_references(self) -> typing.Set[AbsoluteIdentifier]:
+        return self._m.global_references() | self._n.global_references()
+
+
+class Fix(Def):
+    """
+    Recursive binding `letrec f = M in f`, where `M` refers to the binding as the value of index 0.
+    When applied, it is unrolled to `M` with those values replaced by the node itself,
+    unless the application may yet be discarded, see `Def.beta`.
+    The result of a closed node is computed once and shared by all of its unrollings,
+    so a recursive call costs O(1) instead of a copy of `M` per call, as with fixpoint combinators.
+    Unlike recursive definitions, a node which is not applied is not unrolled, so it has a normal form.
+    """
+    _unrolled = None
+
+    def __init__(self, identifier: RelativeIdentifier, body: Def):
+        self._identifier: RelativeIdentifier = identifier
+        self._body = body
+        self._free_bound = max(body._free_bound - 1, 0)
+        self._size = body._size + 1
+        self._hash = hash((6, body._hash))
+
+    def __eq__(self, other):
+        return isinstance(other, Fix) and self._body == other._body
+
+    __hash__ = Def.__hash__
+
+    def link(self, namespace_identifier):
+        return Fix(self._identifier, self._body.link(namespace_identifier))
+
+    @log
+    def shift(self, d, c=0):
+        if self._free_bound <= c:
+            return self
+        return Fix(self._identifier, self._body.shift(d, c + 1))
+
+    @log
+    def substitute(self, expr, j=0):
+        if self._free_bound <= j:
+            return self
+        return Fix(
+            self._identifier,
+            self._body.substitute(
+                expr.shift(1),
+                j + 1
             )
+        )
+
+    @log
+    def beta(self, context, speculative: bool = False):
+        body = self._body.beta(context, speculative)
+        result = self if body is self._body else Fix(self._identifier, body)
+        if self._free_bound == 0 and context.memo is not None and (result is not self or not speculative):
+            source = context.memo.source(self)
+            if source is not None:
+                context.memo.reduced(source, self, result)
+        return result
+
+    def unroll(self) -> Def:
+        """
+        :returns: The body with the recursive binding replaced by this node
+        """
+        if self._unrolled is not None:
+            return self._unrolled
+        unrolled = self._body.substitute(self.shift(1)).shift(-1)
+        if self._free_bound == 0:
+            self._unrolled = unrolled
+        return unrolled
+
+    def eta(self):
+        body = self._body.eta()
+        if body is self._body:
+            return self
+        return Fix(self._identifier, body)
+
+    def bound_to(self, root_index=0):
+        return self._free_bound > root_index and self._body.bound_to(root_index + 1)
+
+    def global_references(self) -> typing.Set[AbsoluteIdentifier]:
+        return self._body.global_references()
+
+
+class LnDef(Def):
+    """
+    Locally nameless expression: values bound by abstractions inside the expression are
+    de Brujin indices (`LnBound`), but values crossing a binder being reduced under are names (`LnFree`).
+    Expressions substituted into the body of an abstraction have no dangling indices,
+    so neither they nor the body are ever shifted.
+    Abstractions are compared by their bodies, so alpha-equivalent expressions are equal.
+    """
+    def __str__(self, comment: bool = True):
+        return from_locally_nameless(self).__str__(comment=comment)
+
+    def link(self, namespace_identifier: NamespaceIdentifier):
+        raise NotImplementedError(self.__class__.__name__)
+
+    def open(self, expr: Def, k: int = 0) -> Def:
+        """
+        :returns: A copy of the expression with values bound by the `k`-th enclosing binder
+        replaced with `expr`, which must not have dangling indices
+        """
+        raise NotImplementedError(self.__class__.__name__)
+
+    def close(self, atom: int, k: int = 0) -> Def:
+        """
+        :returns: A copy of the expression with `LnFree` values of `atom` bound by the `k`-th enclosing binder
+        """
+        raise NotImplementedError(self.__class__.__name__)
+
+    def eta(self):
+        """
+        η-reduces the de Brujin version of the expression, which must not have values named
+        while reducing under a binder
+        """
+        expr = from_locally_nameless(self)
+        reduced = expr.eta()
+        if reduced is expr:
+            return self
+        return to_locally_nameless(reduced)
+
+
+_atoms = itertools.count(-1, -1)
+
+
+def fresh_value(identifier: Identifier) -> 'LnFree':
+    """
+    :returns: A value named with an atom no other value has, to open the body of a binder with
+    """
+    return LnFree(identifier, next(_atoms))
+
+
+def _ln_under_binder(binder: Def, context, speculative: bool) -> Def:
+    """
+    Reduces the body of a binder, naming the value it binds with a fresh atom.
+    The result keeps the reduced body opened with that atom too, so the next round does not open it again.
+    :param binder: `LnAbs` or `LnFix`
+    :returns: `binder` itself if reducing its body changes nothing
+    """
+    body = binder._body
+    if body._free_bound == 0:
+        reduced = body.beta(context, speculative)
+        return binder if reduced is body else binder.__class__(binder._identifier, reduced)
+    if binder._opened is None:
+        value = fresh_value(binder._identifier)
+        binder._opened = (value._atom, body.open(value))
+    atom, opened = binder._opened
+    reduced = opened.beta(context, speculative)
+    if reduced is opened:
+        return binder
+    result = binder.__class__(binder._identifier, reduced.close(atom))
+    result._opened = (atom, reduced)
+    return result
+
+
+class LnRef(GlobalRef):
+    """
+    Reference to a top-level definition unfolded to the locally nameless version of its body
+    """
+    def __eq__(self, other):
+        return isinstance(other, GlobalRef) and self._absolute_identifier == other._absolute_identifier
+
+    __hash__ = Def.__hash__
+
+    @log
+    def beta(self, context, speculative: bool = False) -> Def:
+        return to_locally_nameless(context.get_def(self._absolute_identifier))
+
+
+class LnBound(LnDef):
+    _reducible = False
+
+    def __init__(self, identifier: Identifier, index: int):
+        assert index >= 0
+        self._identifier = identifier
+        self._index = index
+        self._free_bound = index + 1
+        self._hash = hash((7, index))
+
+    def __eq__(self, other):
+        return isinstance(other, LnBound) and self._index == other._index
+
+    __hash__ = Def.__hash__
+
+    def open(self, expr, k=0):
+        return expr if self._index == k else self
+
+    def close(self, atom, k=0):
+        return self
+
+    @log
+    def beta(self, context, speculative: bool = False):
+        return self
+
+    def bound_to(self, root_index=0):
+        return self._index == root_index
+
+    def global_references(self) -> typing.Set[AbsoluteIdentifier]:
+        return set()
+
+
+class LnFree(LnDef):
+    """
+    Named value. Atoms of values introduced when reducing under binders are negative,
+    non-negative atoms stand for values free in the converted expression, see `to_locally_nameless`.
+    """
+    _has_free = True
+    _reducible = False
+
+    def __init__(self, identifier: Identifier, atom: int):
+        self._identifier = identifier
+        self._atom = atom
+        self._hash = hash((8, atom))
+
+    def __eq__(self, other):
+        return isinstance(other, LnFree) and self._atom == other._atom
+
+    __hash__ = Def.__hash__
+
+    def open(self, expr, k=0):
+        return self
+
+    def close(self, atom, k=0):
+        return LnBound(self._identifier, k) if self._atom == atom else self
+
+    @log
+    def beta(self, context, speculative: bool = False):
+        return self
+
+    def bound_to(self, root_index=0):
+        return False
+
+    def global_references(self) -> typing.Set[AbsoluteIdentifier]:
+        return set()
+
+
+class LnAbs(LnDef):
+    # Atom and body opened with it, see `_ln_under_binder`
+    _opened = None
+
+    def __init__(self, identifier: RelativeIdentifier, body: Def):
+        self._identifier: RelativeIdentifier = identifier
+        self._body = body
+        self._free_bound = max(body._free_bound - 1, 0)
+        self._has_free = body._has_free
+        self._reducible = body._reducible
+        self._size = body._size + 1
+        self._hash = hash((4, body._hash))
+
+    def __eq__(self, other):
+        return isinstance(other, LnAbs) and self._body == other._body
+
+    __hash__ = Def.__hash__
+
+    def open(self, expr, k=0):
+        if self._free_bound <= k:
+            return self
+        return LnAbs(self._identifier, self._body.open(expr, k + 1))
+
+    def close(self, atom, k=0):
+        if not self._has_free:
+            return self
+        body = self._body.close(atom, k + 1)
+        if body is self._body:
+            return self
+        return LnAbs(self._identifier, body)
+
+    @log
+    def beta(self, context, speculative: bool = False):
+        if not self._reducible:
+            return self
+        return _ln_under_binder(self, context, speculative)
+
+    def bound_to(self, root_index=0):
+        return self._free_bound > root_index and self._body.bound_to(root_index + 1)
+
+    def global_references(self) -> typing.Set[AbsoluteIdentifier]:
+        return self._body.global_references()
+
+
+class LnApp(LnDef):
+    def __init__(self, m: Def, n: Def):
+        self._m = m
+        self._n = n
+        self._free_bound = max(m._free_bound, n._free_bound)
+        self._has_free = m._has_free or n._has_free
+        self._reducible = isinstance(m, (LnAbs, LnFix)) or m._reducible or n._reducible
+        self._size = m._size + n._size + 1
+        self._hash = hash((5, m._hash, n._hash))
+        # Leftmost node of the application spine
+        self._head = m._head if isinstance(m, LnApp) else m
+
+    def __eq__(self, other):
+        return isinstance(other, LnApp) and self._m == other._m and self._n == other._n
+
+    __hash__ = Def.__hash__
+
+    def open(self, expr, k=0):
+        if self._free_bound <= k:
+            return self
+        return LnApp(self._m.open(expr, k), self._n.open(expr, k))
+
+    def close(self, atom, k=0):
+        if not self._has_free:
+            return self
+        m = self._m.close(atom, k)
+        n = self._n.close(atom, k)
+        if m is self._m and n is self._n:
+            return self
+        return LnApp(m, n)
+
+    @log
+    def beta(self, context, speculative: bool = False):
+        if not self._reducible:
+            return self
+        if isinstance(self._m, LnAbs):
+            return self._m._body.open(self._n)
+        elif isinstance(self._m, LnFix) and not speculative:
+            return LnApp(self._m.unroll(), self._n.beta(context, True))
+        m = self._m.beta(context, speculative)
+        n = self._n.beta(context, speculative or not isinstance(self._head, (LnBound, LnFree, LocalRef)))
+        if m is self._m and n is self._n:
+            return self
+        return LnApp(m, n)
+
+    def bound_to(self, root_index=0):
+        return self._free_bound > root_index and (self._m.bound_to(root_index) or self._n.bound_to(root_index))
+
+    def global_references(self) -> typing.Set[AbsoluteIdentifier]:
+        return self._m.global_references() | self._n.global_references()
+
+
+class LnFix(LnDef):
+    """
+    Locally nameless `Fix`: unrolling opens the body with the node itself
+    """
+    _unrolled = None
+    # Atom and body opened with it, see `_ln_under_binder`
+    _opened = None
+
+    def __init__(self, identifier: RelativeIdentifier, body: Def):
+        self._identifier: RelativeIdentifier = identifier
+        self._body = body
+        self._free_bound = max(body._free_bound - 1, 0)
+        self._has_free = body._has_free
+        self._reducible = body._reducible
+        self._size = body._size + 1
+        self._hash = hash((6, body._hash))
+
+    def __eq__(self, other):
+        return isinstance(other, LnFix) and self._body == other._body
+
+    __hash__ = Def.__hash__
+
+    def open(self, expr, k=0):
+        if self._free_bound <= k:
+            return self
+        return LnFix(self._identifier, self._body.open(expr, k + 1))
+
+    def close(self, atom, k=0):
+        if not self._has_free:
+            return self
+        body = self._body.close(atom, k + 1)
+        if body is self._body:
+            return self
+        return LnFix(self._identifier, body)
+
+    @log
+    def beta(self, context, speculative: bool = False):
+        if not self._reducible:
+            return self
+        return _ln_under_binder(self, context, speculative)
+
+    def unroll(self) -> Def:
+        if self._unrolled is None:
+            self._unrolled = self._body.open(self)
+        return self._unrolled
+
+    def bound_to(self, root_index=0):
+        return self._free_bound > root_index and self._body.bound_to(root_index + 1)
+
+    def global_references(self) -> typing.Set[AbsoluteIdentifier]:
+        return self._body.global_references()
+
+
+def to_locally_nameless(expr: Def, depth: int = 0) -> Def:
+    """
+    Values free in `expr` become `LnFree` values whose atom is the de Brujin index
+    of the value outside of `expr`. The result for a closed expression is cached on it.
+    :param depth: Number of binders of the original expression `expr` is nested in
+    """
+    if expr._ln is not None:
+        return expr._ln
+    if isinstance(expr, Val):
+        if expr._index >= depth:
+            return LnFree(expr._identifier, expr._index - depth)
+        result = LnBound(expr._identifier, expr._index)
+    elif isinstance(expr, Abs):
+        result = LnAbs(expr._identifier, to_locally_nameless(expr._body, depth + 1))
+    elif isinstance(expr, Fix):
+        result = LnFix(expr._identifier, to_locally_nameless(expr._body, depth + 1))
+    elif isinstance(expr, App):
+        result = LnApp(to_locally_nameless(expr._m, depth), to_locally_nameless(expr._n, depth))
+    elif isinstance(expr, GlobalRef):
+        result = LnRef(expr._absolute_identifier)
+    elif isinstance(expr, LocalRef):
+        return expr
+    else:
+        raise NotImplementedError(expr.__class__.__name__)
+    if expr._free_bound == 0:
+        expr._ln = result
+    return result
+
+
+def from_locally_nameless(expr: Def, depth: int = 0) -> Def:
+    """
+    Inverse of `to_locally_nameless`
+    :raises ValueError: if the expression has values named while reducing under a binder
+    """
+    if isinstance(expr, LnBound):
+        return Val(expr._identifier, expr._index)
+    elif isinstance(expr, LnFree):
+        if expr._atom < 0:
+            raise ValueError('Value %s is not bound to anything' % expr._identifier)
+        return Val(expr._identifier, expr._atom + depth)
+    elif isinstance(expr, LnAbs):
+        return Abs(expr._identifier, from_locally_nameless(expr._body, depth + 1))
+    elif isinstance(expr, LnFix):
+        return Fix(expr._identifier, from_locally_nameless(expr._body, depth + 1))
+    elif isinstance(expr, LnApp):
+        return App(from_locally_nameless(expr._m, depth), from_locally_nameless(expr._n, depth))
+    elif isinstance(expr, LnRef):
+        return GlobalRef(expr._absolute_identifier)
+    elif isinstance(expr, LocalRef):
+        return expr
+    raise NotImplementedError(expr.__class__.__name__)
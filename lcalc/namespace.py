@@ -1,3 +1,4 @@
+import types
 import typing
 
 from .identifiers import RelativeIdentifier, NamespaceIdentifier
@@ -35,22 +36,75 @@ class Namespace(object):
             statement.relative_identifier: statement.expr
             for statement in statements
         }
+        self._normalized: typing.Dict[RelativeIdentifier, Def] = {}
 
     def link(self, namespace_identifier: NamespaceIdentifier):
         for identifier in self._exprs.keys():
             self._exprs[identifier] = self._exprs[identifier].link(namespace_identifier)
 
+    def set_normalized(self, relative_identifier: RelativeIdentifier, expr: Def):
+        """
+        Stores a body of a definition derived from the source one at link time,
+        e.g. an optimized or a pre-normalized one.
+        It is returned by `get_def` instead of the source one.
+        """
+        self._normalized[relative_identifier] = expr
+
+    def clear_normalized(self):
+        self._normalized.clear()
+
     def has_def(self, relative_identifier: RelativeIdentifier) -> bool:
         return relative_identifier in self._exprs
 
-    def get_def(self, relative_identifier: RelativeIdentifier) -> Def:
+    def _check_def(self, relative_identifier: RelativeIdentifier):
         if not self.has_def(relative_identifier):
             raise Exception('"%s" is not defined. Defined identifiers are:\n%s' % (
                 relative_identifier,
                 ''.join(f'  {n}\n' for n in self._exprs),
             ))
+
+    def get_def(self, relative_identifier: RelativeIdentifier) -> Def:
+        self._check_def(relative_identifier)
+        if relative_identifier in self._normalized:
+            return self._normalized[relative_identifier]
         return self._exprs[relative_identifier]
 
+    def get_source_def(self, relative_identifier: RelativeIdentifier) -> Def:
+        """
+        Same as `get_def`, but ignores pre-normalized bodies
+        """
+        self._check_def(relative_identifier)
+        return self._exprs[relative_identifier]
+
+    @property
+    def relative_identifiers(self) -> typing.List[RelativeIdentifier]:
+        return list(self._exprs.keys())
+
     @property
     def import_statements(self):
         return self._import_statements
+
+    def freeze(self) -> 'FrozenNamespace':
+        return FrozenNamespace(self)
+
+
+class FrozenNamespace(Namespace):
+    """
+    Read-only copy of a linked namespace. Definitions are shared with the original namespace.
+    """
+    def __init__(self, namespace: Namespace):
+        self._import_statements = tuple(namespace._import_statements)
+        self._exprs = types.MappingProxyType(dict(namespace._exprs))
+        self._normalized = types.MappingProxyType(dict(namespace._normalized))
+
+    def link(self, namespace_identifier: NamespaceIdentifier):
+        raise Exception('Frozen namespace can not be linked again')
+
+    def set_normalized(self, relative_identifier: RelativeIdentifier, expr: Def):
+        raise Exception('Frozen namespace can not be changed')
+
+    def clear_normalized(self):
+        raise Exception('Frozen namespace can not be changed')
+
+    def freeze(self) -> 'FrozenNamespace':
+        return self
@@ -0,0 +1,206 @@
+import typing
+
+from .identifiers import AbsoluteIdentifier
+from .model import Def, GlobalRef, Abs, App, Fix, LnAbs, LnApp, LnFix, LnFree, fresh_value
+
+
+class Pass(object):
+    """
+    A rewrite of an expression keeping it β-equivalent (or βη-equivalent) to the original one.
+    """
+    name: str = None
+    # Whether the pass may run on the expression being reduced, not only on top-level definitions
+    between_rounds = True
+
+    def run(self, expr: Def, context) -> typing.Tuple[Def, int]:
+        """
+        :returns: Rewritten expression and number of rewrites made
+        """
+        raise NotImplementedError(self.__class__.__name__)
+
+    def reset(self):
+        """
+        Forgets everything cached about definitions of the context
+        """
+        pass
+
+
+def _rewrite(expr: Def, rewrite: typing.Callable[[Def], typing.Optional[Def]]) -> typing.Tuple[Def, int]:
+    """
+    Applies `rewrite` to each node bottom-up, keeping nodes for which it returns None.
+    Works on both de Brujin and locally nameless expressions. Bodies of locally nameless binders
+    are opened with a fresh value first, so `rewrite` never sees a dangling index.
+    Nodes are visited with an explicit stack, so deep expressions do not exhaust the recursion limit.
+    :returns: Rewritten expression and number of rewrites made
+    """
+    rewrites = 0
+    # Nodes to visit, with the value and the body a locally nameless binder was opened with,
+    # and whether their children are already rewritten onto `results`
+    stack: typing.List[typing.Tuple[Def, typing.Optional[typing.Tuple[LnFree, Def]], bool]] = [(expr, None, False)]
+    results: typing.List[Def] = []
+    while stack:
+        node, opened, visited = stack.pop()
+        if not visited:
+            if isinstance(node, (LnAbs, LnFix)) and node._body._free_bound > 0:
+                value = fresh_value(node._identifier)
+                opened = (value, node._body.open(value))
+                stack.append((node, opened, True))
+                stack.append((opened[1], None, False))
+            elif isinstance(node, (Abs, Fix, LnAbs, LnFix)):
+                stack.append((node, None, True))
+                stack.append((node._body, None, False))
+            elif isinstance(node, (App, LnApp)):
+                stack.append((node, None, True))
+                stack.append((node._n, None, False))
+                stack.append((node._m, None, False))
+            else:
+                stack.append((node, None, True))
+            continue
+        if isinstance(node, (Abs, Fix, LnAbs, LnFix)):
+            body = results.pop()
+            if opened is not None:
+                value, opened_body = opened
+                if body is not opened_body:
+                    node = node.__class__(node._identifier, body.close(value._atom))
+            elif body is not node._body:
+                node = node.__class__(node._identifier, body)
+        elif isinstance(node, (App, LnApp)):
+            n = results.pop()
+            m = results.pop()
+            if m is not node._m or n is not node._n:
+                node = node.__class__(m, n)
+        rewritten = rewrite(node)
+        if rewritten is None:
+            results.append(node)
+        else:
+            results.append(rewritten)
+            rewrites += 1
+    return results.pop(), rewrites
+
+
+class EtaReduction(Pass):
+    """
+    Replaces `λx.M x` with `M` when `M` does not use `x`.
+    Note that it changes normal forms to their η-normal forms, so it only rewrites top-level definitions
+    and is not a part of the default pipeline.
+    """
+    name = 'eta'
+    between_rounds = False
+
+    def run(self, expr: Def, context) -> typing.Tuple[Def, int]:
+        reduced = expr.eta()
+        # Each η-reduction removes exactly an abstraction, an application and a value
+        return reduced, (expr.size - reduced.size) // 3
+
+
+class DeadBinderPruning(Pass):
+    """
+    Replaces `(λx.M) N` with `M` when `M` does not use `x`, without reducing `N`.
+    """
+    name = 'prune'
+
+    def run(self, expr: Def, context) -> typing.Tuple[Def, int]:
+        return _rewrite(expr, self._prune)
+
+    @staticmethod
+    def _prune(expr: Def) -> typing.Optional[Def]:
+        if isinstance(expr, App) and isinstance(expr._m, Abs) and not expr._m._body.bound_to(0):
+            return expr._m._body.shift(-1)
+        if isinstance(expr, LnApp) and isinstance(expr._m, LnAbs) and not expr._m._body.bound_to(0):
+            # Only the binder being pruned may be dangling in its body, see `_rewrite`
+            return expr._m._body.open(expr._n)
+        return None
+
+
+class SmallDefinitionInlining(Pass):
+    """
+    Replaces references to non-recursive definitions of at most `max_size` nodes with their bodies.
+    """
+    name = 'inline'
+
+    def __init__(self, max_size: int = 16):
+        self._max_size = max_size
+        self._inlinable: typing.Optional[typing.Set[AbsoluteIdentifier]] = None
+
+    def reset(self):
+        self._inlinable = None
+
+    def _find_inlinable(self, context) -> typing.Set[AbsoluteIdentifier]:
+        recursive = context.recursive_definitions()
+        return {
+            absolute_identifier
+            for absolute_identifier, expr in context.definitions().items()
+            if absolute_identifier not in recursive and expr.size <= self._max_size
+        }
+
+    def run(self, expr: Def, context) -> typing.Tuple[Def, int]:
+        if self._inlinable is None:
+            self._inlinable = self._find_inlinable(context)
+
+        def inline(node: Def) -> typing.Optional[Def]:
+            if isinstance(node, GlobalRef) and node._absolute_identifier in self._inlinable:
+                return node.beta(context)
+            return None
+        return _rewrite(expr, inline)
+
+
+class PassReport(object):
+    def __init__(self):
+        self.runs = 0
+        self.rewrites = 0
+        self.size_saved = 0
+        # Steps evaluating takes without the pass minus the steps it takes with it,
+        # only known when measured, see `benchmark.measure_steps_saved`
+        self.steps_saved: typing.Optional[int] = None
+
+
+def default_passes() -> typing.List[Pass]:
+    return [
+        SmallDefinitionInlining(),
+        DeadBinderPruning(),
+    ]
+
+
+class Optimizer(object):
+    """
+    Runs a pipeline of passes, counting how much each of them shrinks expressions.
+    A rewrite does not necessarily save a reduction step, e.g. a pruned argument may not have been
+    reduced anyway, so the steps a pass saves are measured by evaluating without it.
+
+    Passes rewrite top-level definitions at link time. Bodies unfolded during evaluation
+    are already rewritten, so running the passes on the whole expression between reduction rounds
+    is rarely worth its cost, and only done with `between_rounds`.
+    """
+    def __init__(self, passes: typing.Optional[typing.List[Pass]] = None, between_rounds: bool = False):
+        self._passes = passes if passes is not None else default_passes()
+        self.between_rounds = between_rounds
+        self.report: typing.Dict[str, PassReport] = {
+            optimization_pass.name: PassReport()
+            for optimization_pass in self._passes
+        }
+
+    def reset(self):
+        for optimization_pass in self._passes:
+            optimization_pass.reset()
+
+    def run(self, expr: Def, context, between_rounds: bool = False) -> Def:
+        """
+        :param between_rounds: Whether `expr` is being reduced, so passes rewriting only definitions are skipped
+        """
+        for optimization_pass in self._passes:
+            if between_rounds and not optimization_pass.between_rounds:
+                continue
+            size = expr.size
+            expr, rewrites = optimization_pass.run(expr, context)
+            report = self.report[optimization_pass.name]
+            report.runs += 1
+            report.rewrites += rewrites
+            report.size_saved += size - expr.size
+        return expr
+
+    def summary(self) -> str:
+        lines = ['%8s %10s %12s %12s  %s' % ('runs', 'rewrites', 'size saved', 'steps saved', 'pass')]
+        for name, report in self.report.items():
+            steps_saved = '-' if report.steps_saved is None else '%d' % report.steps_saved
+            lines.append('%8d %10d %12d %12s  %s' % (report.runs, report.rewrites, report.size_saved, steps_saved, name))
+        return '\n'.join(lines)
@@ -0,0 +1,158 @@
+import concurrent.futures
+import typing
+
+from .identifiers import NamespaceIdentifier, RelativeIdentifier, AbsoluteIdentifier
+from .context import Context, StepLimitExceeded
+from .model import Def, GlobalRef, Abs, App, Fix
+from .namespace import Statement, Namespace
+from .serialization import dumps, loads
+
+_worker_context: typing.Optional[Context] = None
+
+
+def _init_worker(labels: typing.List[str], data: bytes):
+    global _worker_context
+    statements: typing.Dict[NamespaceIdentifier, typing.List[Statement]] = {}
+    for label, expr in zip(labels, loads(data)):
+        namespace, name = label.split('/', 1)
+        statements.setdefault(NamespaceIdentifier(namespace), []).append(Statement(RelativeIdentifier(name), expr))
+    _worker_context = Context({
+        namespace_identifier: Namespace([], namespace_statements)
+        for namespace_identifier, namespace_statements in statements.items()
+    })
+
+
+def _head_normalize(context: Context, expr: Def) -> typing.Tuple[typing.List[Abs], Def, typing.List[Def]]:
+    """
+    Reduces leftmost outermost redexes until the head of the expression is neither a redex
+    nor a reference to a definition.
+    :returns: Abstractions around the application spine, its head and its arguments
+    """
+    binders: typing.List[Abs] = []
+    while True:
+        while isinstance(expr, Abs):
+            binders.append(expr)
+            expr = expr._body
+        args: typing.List[Def] = []
+        while isinstance(expr, App):
+            args.append(expr._n)
+            expr = expr._m
+        args.reverse()
+        if isinstance(expr, GlobalRef):
+            expr = expr.beta(context)
+        elif isinstance(expr, Abs) and args:
+            expr = App(expr, args.pop(0)).contract()
+        elif isinstance(expr, Fix) and args:
+            expr = expr.unroll()
+        else:
+            return binders, expr, args
+        for arg in args:
+            expr = App(expr, arg)
+
+
+def _reduce(data: bytes, max_steps: int) -> typing.Tuple[typing.Optional[typing.List[str]], bytes]:
+    """
+    Normalizes the expression if it takes at most `max_steps` steps, otherwise reduces it
+    to head normal form `λx1...λxn.h a1 ... ak` so the parts can be reduced independently.
+    :returns: None and the normal form, or names of the binders, and the head followed by the parts:
+    the body of the head if it is a recursive binding, then the arguments
+    """
+    expr = loads(data)[0]
+    try:
+        return None, dumps([_worker_context.normalize(expr, max_steps=max_steps)])
+    except StepLimitExceeded as e:
+        binders, head, args = _head_normalize(_worker_context, e.expr)
+    parts = [head._body] if isinstance(head, Fix) else []
+    return [str(binder._identifier) for binder in binders], dumps([head] + parts + args)
+
+
+class _Spine(object):
+    """
+    Head normal form of an expression whose parts are being normalized, see `_reduce`
+    """
+    def __init__(self, binders: typing.List[str], head: Def, parts: int):
+        self.binders = binders
+        self.head = head
+        self.parts: typing.List[typing.Union[Def, '_Spine', None]] = [None] * parts
+
+    def build(self) -> Def:
+        parts = [_build(part) for part in self.parts]
+        result = self.head
+        if isinstance(result, Fix):
+            result = Fix(result._identifier, parts.pop(0))
+        for part in parts:
+            result = App(result, part)
+        for binder in reversed(self.binders):
+            result = Abs(RelativeIdentifier(binder), result)
+        return result
+
+
+def _build(part: typing.Union[Def, _Spine]) -> Def:
+    return part.build() if isinstance(part, _Spine) else part
+
+
+class ParallelEvaluator(object):
+    """
+    Normalizes expressions reducing independent subterms in a pool of processes.
+
+    A worker normalizes the expression if it takes at most `threshold` steps. Otherwise it reduces
+    the expression to head normal form `λx1...λxn.h a1 ... ak` and sends back its parts:
+    as the head `h` is a value or a recursive binding, the arguments can not interact anymore,
+    and they and the body of the binding are queued to be reduced the same way. Parts taking long
+    are thus split again and again, down to subterms which reach normal form within `threshold` steps,
+    and the work is spread across the pool however deep in the expression it lies.
+    How much work an expression takes is not known from its size, `MULT 10 10` being small,
+    so it is only split once it has taken that many steps.
+    Workers take pending parts from the pool's shared queue in the order they were split,
+    this process only decodes the results, queues the parts and assembles the normal form.
+    """
+    def __init__(self, context: Context, workers: typing.Optional[int] = None, threshold: int = 100):
+        self._context = context
+        self._threshold = threshold
+        self.submitted = 0
+        definitions = context.definitions()
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(
+                [str(absolute_identifier) for absolute_identifier in definitions],
+                dumps(list(definitions.values())),
+            ),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown()
+
+    def eval(self, absolute_identifier: AbsoluteIdentifier) -> Def:
+        return self.normalize(self._context.get_def(absolute_identifier))
+
+    def normalize(self, expr: Def) -> Def:
+        result: typing.List[typing.Union[Def, _Spine, None]] = [None]
+        # Parts being reduced, with the list and the index they belong at
+        pending: typing.Dict[concurrent.futures.Future, typing.Tuple[typing.List, int]] = {}
+
+        def submit(part: Def, parts: typing.List, index: int):
+            pending[self._executor.submit(_reduce, dumps([part]), self._threshold)] = parts, index
+            self.submitted += 1
+
+        submit(expr, result, 0)
+        while pending:
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                parts, index = pending.pop(future)
+                binders, data = future.result()
+                terms = loads(data)
+                if binders is None:
+                    parts[index] = terms[0]
+                    continue
+                spine = _Spine(binders, terms[0], len(terms) - 1)
+                parts[index] = spine
+                for part_index, part in enumerate(terms[1:]):
+                    submit(part, spine.parts, part_index)
+        return _build(result[0])
@@ -4,9 +4,12 @@ import typing
 import parsec
 
 from .identifiers import NamespaceIdentifier, RelativeIdentifier, AbsoluteIdentifier, Identifier
-from .model import Def, GlobalRef, LocalRef, Val, Abs, App
+from .model import Def, GlobalRef, LocalRef, Val, Abs, App, Fix
 from .namespace import Statement, ImportStatement, Namespace
 
+IDENTIFIER_CHARACTERS = string.ascii_letters + '_' + string.digits
+NO_KEYWORDS: typing.FrozenSet[str] = frozenset()
+
 
 class Parser(object):
     def white(self):
@@ -47,20 +50,33 @@ class Parser(object):
         @parsec.generate
         def parser():
             yield self.comment()
-            rest = yield parsec.many1(parsec.one_of(string.ascii_letters + '_' + string.digits))
+            rest = yield parsec.many1(parsec.one_of(IDENTIFIER_CHARACTERS))
             yield self.comment()
             return NamespaceIdentifier(''.join(rest))
         return parser
 
-    def relative_identifier(self):
+    def relative_identifier(self, keywords: typing.AbstractSet[str] = NO_KEYWORDS):
+        """
+        :param keywords: Words which are not identifiers here
+        """
         @parsec.generate
         def parser():
             yield self.comment()
-            rest = yield parsec.many1(parsec.one_of(string.ascii_letters + '_' + string.digits))
+            rest = yield parsec.many1(parsec.one_of(IDENTIFIER_CHARACTERS))
+            if ''.join(rest) in keywords:
+                yield parsec.fail_with('identifier')
             yield self.comment()
             return RelativeIdentifier(''.join(rest))
         return parser
 
+    def keyword(self, name: str):
+        @parsec.generate
+        def parser():
+            yield parsec.string(name)
+            yield parsec.lookahead(parsec.try_choice(parsec.none_of(IDENTIFIER_CHARACTERS), parsec.eof()))
+            return name
+        return parser
+
     def absolute_identifier(self) -> Identifier:
         @parsec.generate
         def parser():
@@ -80,10 +96,10 @@ class Parser(object):
 
         return parser
 
-    def p_val(self, abss) -> parsec.Parser:
+    def p_val(self, abss, keywords: typing.AbstractSet[str] = NO_KEYWORDS) -> parsec.Parser:
         @parsec.generate
         def parser() -> Val:
-            identifier = yield parsec.try_choice(self.absolute_identifier(), self.relative_identifier())
+            identifier = yield parsec.try_choice(self.absolute_identifier(), self.relative_identifier(keywords))
             for index, abs in enumerate(abss[::-1]):
                 if abs == identifier:
                     return Val(identifier, index)
@@ -94,25 +110,51 @@ class Parser(object):
                     return LocalRef(identifier)
         return parser
 
-    def p_abs(self, abss) -> parsec.Parser:
+    def p_abs(self, abss, keywords: typing.AbstractSet[str] = NO_KEYWORDS) -> parsec.Parser:
         @parsec.generate
         def parser() -> Abs:
             yield parsec.try_choice(parsec.string('λ'), parsec.string('\\'))
             identifier = yield self.relative_identifier()
             yield parsec.string('.')
-            body = yield self.p_expr(abss + [identifier])
+            body = yield self.p_expr(abss + [identifier], keywords)
             return Abs(identifier, body)
         return parser
 
-    def p_non_app(self, abss):
+    def p_let(self, abss, keywords: typing.AbstractSet[str] = NO_KEYWORDS) -> parsec.Parser:
+        """
+        `let x = N in M` is `(λx.M) N`, and `letrec f = N in M` is `(λf.M) F`
+        where `F` is a `Fix` node binding `f` in `N`.
+        The words are only keywords in this form: `let` and `letrec` elsewhere are identifiers,
+        and `in` is one everywhere but in `N`, where a value named `in` must be parenthesized
+        """
+        @parsec.generate
+        def parser() -> Def:
+            keyword = yield parsec.try_choice(self.keyword('letrec'), self.keyword('let'))
+            identifier = yield self.relative_identifier()
+            yield parsec.string('=')
+            value = yield self.p_expr(abss + [identifier] if keyword == 'letrec' else abss, keywords | {'in'})
+            yield self.keyword('in')
+            body = yield self.p_expr(abss + [identifier], keywords)
+            if keyword == 'let':
+                return App(Abs(identifier, body), value)
+            fix = Fix(identifier, value)
+            if isinstance(body, Val) and body._index == 0:
+                return fix
+            return App(Abs(identifier, body), fix)
+        return parser
+
+    def p_non_app(self, abss, keywords: typing.AbstractSet[str] = NO_KEYWORDS):
         @parsec.generate
         def parser():
             yield self.comment()
             expr = yield parsec.try_choice(
                 self.parens(self.p_expr(abss)),
                 parsec.try_choice(
-                    self.p_abs(abss),
-                    self.p_val(abss)
+                    self.p_abs(abss, keywords),
+                    parsec.try_choice(
+                        self.p_let(abss, keywords),
+                        self.p_val(abss, keywords)
+                    )
                 )
             )
             yield self.comment()
@@ -120,13 +162,13 @@ class Parser(object):
 
         return parser
 
-    def p_app(self, abss):
+    def p_app(self, abss, keywords: typing.AbstractSet[str] = NO_KEYWORDS):
         @parsec.generate
         def parser():
-            term = yield self.p_non_app(abss)
+            term = yield self.p_non_app(abss, keywords)
             while True:
                 next_term = yield parsec.try_choice(
-                    self.p_non_app(abss),
+                    self.p_non_app(abss, keywords),
                     parsec.string(''),
                 )
                 if next_term is '':
@@ -136,15 +178,18 @@ class Parser(object):
 
         return parser
 
-    def p_expr(self, abss):
+    def p_expr(self, abss, keywords: typing.AbstractSet[str] = NO_KEYWORDS):
+        """
+        :param keywords: Words which are not values here, see `p_let`
+        """
         @parsec.generate
         def parser():
             yield self.comment()
             expr = yield parsec.try_choice(
-                self.p_abs(abss),
+                self.p_abs(abss, keywords),
                 parsec.try_choice(
-                    self.p_app(abss),
-                    self.p_val(abss)
+                    self.p_app(abss, keywords),
+                    self.p_val(abss, keywords)
                 )
             )
             yield self.comment()
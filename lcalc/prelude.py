@@ -0,0 +1,49 @@
+import logging
+import pathlib
+
+from .identifiers import NamespaceIdentifier, RelativeIdentifier
+from .namespace import Statement, Namespace
+from .serialization import MappedTerms, SerializationError, dumps
+
+PRELUDE = NamespaceIdentifier('prelude')
+SOURCE_PATH = pathlib.Path(__file__).parent / 'prelude.lcalc'
+SNAPSHOT_PATH = pathlib.Path(__file__).parent / 'prelude.lct'
+
+
+def parse_prelude() -> Namespace:
+    from .parser import parse_namespace
+    with open(str(SOURCE_PATH), encoding='utf-8') as f:
+        namespace = parse_namespace(f.read())
+    namespace.link(PRELUDE)
+    return namespace
+
+
+def load_prelude() -> Namespace:
+    """
+    Loads the bundled prelude from its pre-parsed and pre-linked snapshot,
+    falling back to parsing the source if the snapshot is missing or of an unsupported version.
+    """
+    try:
+        with MappedTerms(SNAPSHOT_PATH) as terms:
+            return Namespace([], [
+                Statement(RelativeIdentifier(label), terms[index])
+                for index, label in enumerate(terms.labels)
+            ])
+    except (OSError, ValueError, SerializationError):
+        logging.warning('Can not load prelude snapshot %s, parsing the source' % SNAPSHOT_PATH)
+        return parse_prelude()
+
+
+def build_snapshot():
+    namespace = parse_prelude()
+    relative_identifiers = namespace.relative_identifiers
+    data = dumps(
+        [namespace.get_source_def(relative_identifier) for relative_identifier in relative_identifiers],
+        labels=[str(relative_identifier) for relative_identifier in relative_identifiers],
+    )
+    with open(str(SNAPSHOT_PATH), 'wb') as f:
+        f.write(data)
+
+
+if __name__ == '__main__':
+    build_snapshot()
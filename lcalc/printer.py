@@ -0,0 +1,195 @@
+import io
+import typing
+
+from .model import Def, GlobalRef, LocalRef, Val, Abs, App, Fix
+
+
+class _Truncated(Exception):
+    pass
+
+
+class Printer(object):
+    """
+    Writes expressions to a text stream piece by piece, without recursion.
+
+    With `share` enabled, closed subterms occurring more than once are printed once
+    as `let _N = ... in` bindings and referred to by name afterwards.
+    """
+    def __init__(
+            self,
+            stream: typing.TextIO,
+            comment: bool = False,
+            max_length: typing.Optional[int] = None,
+            share: bool = False,
+            share_min_size: int = 8,
+    ):
+        """
+        :param comment: Whether to annotate references and values the way `Def.__str__` does
+        :param max_length: Number of characters after which output is cut with `...`
+        :param share_min_size: Size of the smallest subterm worth a binding
+        """
+        self._stream = stream
+        self._comment = comment
+        self._max_length = max_length
+        self._share = share
+        self._share_min_size = share_min_size
+        self._length = 0
+
+    def print(self, expr: Def) -> bool:
+        """
+        :returns: False if the output was cut because of `max_length`
+        """
+        self._length = 0
+        try:
+            names: typing.Dict[int, str] = {}
+            if self._share:
+                canonical = self._canonical_ids(expr)
+                for node in self._shared_subterms(expr, canonical):
+                    name = '_%d' % (len(names) + 1)
+                    self._write(f'let {name} = ')
+                    self._print(node, canonical, names)
+                    self._write(' in\n')
+                    names[canonical[id(node)]] = name
+            else:
+                canonical = None
+            self._print(expr, canonical, names)
+        except _Truncated:
+            return False
+        return True
+
+    def _write(self, text: str):
+        if self._max_length is not None and self._length + len(text) > self._max_length:
+            self._stream.write(text[:self._max_length - self._length])
+            self._stream.write('...')
+            self._length = self._max_length
+            raise _Truncated()
+        self._stream.write(text)
+        self._length += len(text)
+
+    def _print(
+            self,
+            expr: Def,
+            canonical: typing.Optional[typing.Dict[int, int]],
+            names: typing.Dict[int, str],
+    ):
+        # Items are either text to write, or (expr, tail) pairs. An expression is in a tail position
+        # when nothing follows it up to the end of its enclosing parentheses, so an abstraction
+        # there does not need parentheses of its own.
+        stack: typing.List[typing.Union[str, typing.Tuple[Def, bool]]] = [(expr, True)]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                self._write(item)
+                continue
+            node, tail = item
+            if names and canonical[id(node)] in names:
+                self._write(names[canonical[id(node)]])
+            elif isinstance(node, GlobalRef):
+                self._write(f'{"{absref}" if self._comment else ""}{node._absolute_identifier}')
+            elif isinstance(node, LocalRef):
+                self._write(f'{"{locref}" if self._comment else ""}{node._relative_identifier}')
+            elif isinstance(node, Val):
+                self._write(f'{"{<-%d}" % node._index if self._comment else ""}{node._identifier}')
+            elif isinstance(node, Abs):
+                if tail:
+                    self._write(f'λ{node._identifier}.')
+                    stack.append((node._body, True))
+                else:
+                    self._write(f'(λ{node._identifier}.')
+                    stack.append(')')
+                    stack.append((node._body, True))
+            elif isinstance(node, Fix):
+                # Like an abstraction, the binding extends as far right as possible
+                if tail:
+                    stack.append(f' in {node._identifier}')
+                else:
+                    stack.append(f' in {node._identifier})')
+                    self._write('(')
+                self._write(f'letrec {node._identifier} = ')
+                stack.append((node._body, True))
+            elif isinstance(node, App):
+                if isinstance(node._n, App) and not (names and canonical[id(node._n)] in names):
+                    stack.append(')')
+                    stack.append((node._n, True))
+                    stack.append(' (')
+                else:
+                    stack.append((node._n, tail))
+                    stack.append(' ')
+                stack.append((node._m, False))
+            else:
+                raise NotImplementedError(node.__class__.__name__)
+
+    @staticmethod
+    def _children(node: Def) -> typing.List[Def]:
+        if isinstance(node, (Abs, Fix)):
+            return [node._body]
+        elif isinstance(node, App):
+            return [node._m, node._n]
+        else:
+            return []
+
+    def _canonical_ids(self, expr: Def) -> typing.Dict[int, int]:
+        """
+        :returns: Mapping from `id()` of every node to a number shared by structurally equal nodes
+        """
+        canonical: typing.Dict[int, int] = {}
+        keys: typing.Dict[tuple, int] = {}
+        stack = [expr]
+        while stack:
+            node = stack[-1]
+            if id(node) in canonical:
+                stack.pop()
+                continue
+            pending = [child for child in self._children(node) if id(child) not in canonical]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            if isinstance(node, GlobalRef):
+                key = ('g', str(node._absolute_identifier))
+            elif isinstance(node, LocalRef):
+                key = ('l', str(node._relative_identifier))
+            elif isinstance(node, Val):
+                key = ('v', node._index)
+            else:
+                key = (node.__class__.__name__,) + tuple(canonical[id(child)] for child in self._children(node))
+            canonical[id(node)] = keys.setdefault(key, len(keys))
+        return canonical
+
+    def _shared_subterms(self, expr: Def, canonical: typing.Dict[int, int]) -> typing.List[Def]:
+        """
+        :returns: Closed subterms occurring more than once, smaller ones first
+        """
+        occurrences: typing.Dict[int, int] = {}
+        first: typing.Dict[int, Def] = {}
+        stack = [expr]
+        while stack:
+            node = stack.pop()
+            key = canonical[id(node)]
+            if key in occurrences:
+                occurrences[key] += 1
+                continue
+            occurrences[key] = 1
+            first[key] = node
+            stack.extend(self._children(node))
+        shared = [
+            first[key]
+            for key, count in occurrences.items()
+            if count > 1 and first[key].free_bound == 0 and first[key].size >= self._share_min_size
+        ]
+        shared.sort(key=lambda node: node.size)
+        return shared
+
+
+def write(expr: Def, stream: typing.TextIO, **kwargs) -> bool:
+    """
+    Writes `expr` to `stream`. See `Printer` for keyword arguments.
+    :returns: False if the output was cut because of `max_length`
+    """
+    return Printer(stream, **kwargs).print(expr)
+
+
+def to_string(expr: Def, **kwargs) -> str:
+    stream = io.StringIO()
+    write(expr, stream, **kwargs)
+    return stream.getvalue()
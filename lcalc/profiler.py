@@ -0,0 +1,187 @@
+import time
+import typing
+
+from .model import Def, Abs, App, Fix
+
+Stack = typing.Tuple[str, ...]
+
+
+class _Cost(object):
+    def __init__(self):
+        self.steps = 0
+        self.allocations = 0
+        self.time = 0.0
+
+
+def _children(node: Def) -> typing.List[Def]:
+    if isinstance(node, (Abs, Fix)):
+        return [node._body]
+    elif isinstance(node, App):
+        return [node._m, node._n]
+    else:
+        return []
+
+
+def _copy(expr: Def, stack: Stack) -> Def:
+    """
+    :returns: A copy of `expr` with every node attributed to `stack`
+    """
+    copies: typing.Dict[int, Def] = {}
+    work = [expr]
+    while work:
+        node = work[-1]
+        pending = [child for child in _children(node) if id(child) not in copies]
+        if pending:
+            work.extend(pending)
+            continue
+        work.pop()
+        if id(node) in copies:
+            continue
+        if isinstance(node, Abs):
+            copy = Abs(node._identifier, copies[id(node._body)])
+        elif isinstance(node, App):
+            copy = App(copies[id(node._m)], copies[id(node._n)])
+        elif isinstance(node, Fix):
+            copy = Fix(node._identifier, copies[id(node._body)])
+        else:
+            copy = node.__class__.__new__(node.__class__)
+            copy.__dict__.update(node.__dict__)
+        copy._origin = stack
+        copies[id(node)] = copy
+    return copies[id(expr)]
+
+
+class Profiler(object):
+    """
+    Attributes the cost of an evaluation to top-level definitions.
+
+    Every node of the evaluated expression is tagged with the stack of definitions
+    whose unfolding produced it. A β-reduction is attributed to the stack of the abstraction
+    being applied, together with the time it took and the nodes it allocated.
+    Nodes rebuilt around a reduced subterm are attributed to the stack of their parent.
+    Copies made by the profiler itself to tag unfolded definitions are not counted as allocations,
+    as they are not made when evaluating without it.
+    """
+    def __init__(self):
+        self._costs: typing.Dict[Stack, _Cost] = {}
+        self._round_started = 0.0
+        self._accounted = 0.0
+
+    def _cost(self, stack: Stack) -> _Cost:
+        if stack not in self._costs:
+            self._costs[stack] = _Cost()
+        return self._costs[stack]
+
+    def _tag(self, expr: Def, stack: Stack) -> int:
+        """
+        Attributes untagged nodes of `expr` to the stack of their closest tagged ancestor,
+        or to `stack` if there is none.
+        :returns: Number of nodes tagged
+        """
+        tagged = 0
+        work = [(expr, stack)]
+        while work:
+            node, inherited = work.pop()
+            if node._origin is not None:
+                continue
+            node._origin = inherited
+            self._cost(inherited).allocations += 1
+            tagged += 1
+            for child in _children(node):
+                work.append((child, inherited))
+        return tagged
+
+    def start(self, expr: Def, name: str) -> Def:
+        """
+        :returns: A copy of the expression to evaluate, attributed to the `name` frame
+        """
+        self._round_started = time.perf_counter()
+        self._accounted = 0.0
+        return _copy(expr, (name,))
+
+    def end_round(self, expr: Def, root_stack: Stack):
+        self._tag(expr, root_stack)
+        now = time.perf_counter()
+        self._cost(root_stack).time += now - self._round_started - self._accounted
+        self._round_started = now
+        self._accounted = 0.0
+
+    def unfold(self, ref: Def, body: Def) -> Def:
+        started = time.perf_counter()
+        stack = (ref._origin or ()) + (str(ref._absolute_identifier),)
+        body = _copy(body, stack)
+        elapsed = time.perf_counter() - started
+        self._cost(stack).time += elapsed
+        self._accounted += elapsed
+        return body
+
+    def unroll(self, fix: Fix) -> Def:
+        """
+        Attributes unrolling of a recursive binding to its stack. The shared unrolled body is copied,
+        so tagging does not leak into the next unrollings.
+        """
+        started = time.perf_counter()
+        stack = fix._origin or ()
+        body = _copy(fix.unroll(), stack)
+        cost = self._cost(stack)
+        cost.steps += 1
+        elapsed = time.perf_counter() - started
+        cost.time += elapsed
+        self._accounted += elapsed
+        return body
+
+    def reuse(self, expr: Def, normal_form: Def) -> Def:
+        """
+        Attributes a normal form taken from the memo table to the stack of the expression it replaces
+        """
+        return _copy(normal_form, expr._origin or ())
+
+    def contract(self, redex: App) -> Def:
+        started = time.perf_counter()
+        result = redex.contract()
+        stack = redex._m._origin or redex._origin or ()
+        self._tag(result, stack)
+        cost = self._cost(stack)
+        cost.steps += 1
+        elapsed = time.perf_counter() - started
+        cost.time += elapsed
+        self._accounted += elapsed
+        return result
+
+    def write_collapsed(self, stream: typing.TextIO, metric: str = 'steps'):
+        """
+        Writes costs in the collapsed stack format read by flamegraph tools,
+        one `frame;frame;frame value` line per stack.
+        :param metric: `steps`, `allocations` or `time` (in microseconds)
+        """
+        for stack, cost in sorted(self._costs.items()):
+            value = int(cost.time * 1000000) if metric == 'time' else getattr(cost, metric)
+            if value:
+                stream.write('%s %d\n' % (';'.join(stack), value))
+
+    def summary(self) -> str:
+        """
+        :returns: A table of self and total (including nested unfoldings) costs per definition
+        """
+        own: typing.Dict[str, _Cost] = {}
+        total: typing.Dict[str, _Cost] = {}
+        for stack, cost in self._costs.items():
+            for table, frames in ((own, stack[-1:]), (total, set(stack))):
+                for frame in frames:
+                    if frame not in table:
+                        table[frame] = _Cost()
+                    table[frame].steps += cost.steps
+                    table[frame].allocations += cost.allocations
+                    table[frame].time += cost.time
+        lines = ['%10s %10s %12s %12s %10s %10s  %s' % (
+            'steps', 'total', 'allocations', 'total', 'time, ms', 'total', 'definition',
+        )]
+        for frame in sorted(total, key=lambda frame: (-total[frame].steps, -total[frame].time, frame)):
+            self_cost = own.get(frame, _Cost())
+            lines.append('%10d %10d %12d %12d %10.3f %10.3f  %s' % (
+                self_cost.steps, total[frame].steps,
+                self_cost.allocations, total[frame].allocations,
+                self_cost.time * 1000, total[frame].time * 1000,
+                frame,
+            ))
+        return '\n'.join(lines)
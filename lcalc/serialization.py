@@ -0,0 +1,271 @@
+"""
+Binary encoding of expressions.
+
+Layout (all integers are unsigned LEB128 varints):
+
+    magic       b'LCT\\0'
+    version
+    strings     count, then byte length and UTF-8 bytes of each string
+    index       count, then label (0 for none, string number + 1 otherwise)
+                and node stream byte length of each term
+    terms       node streams, one after another
+
+A node stream is a preorder sequence of nodes, each starting with a tag byte:
+
+    Val         tag, identifier string number, de Brujin index
+    Abs         tag, identifier string number, body
+    App         tag, function, argument
+    GlobalRef   tag, namespace string number, relative identifier string number
+    LocalRef    tag, identifier string number
+    Fix         tag, identifier string number, body (since version 2)
+"""
+import mmap
+import pathlib
+import typing
+
+from .identifiers import NamespaceIdentifier, RelativeIdentifier, AbsoluteIdentifier
+from .model import Def, GlobalRef, LocalRef, Val, Abs, App, Fix
+
+MAGIC = b'LCT\0'
+VERSION = 2
+# Versions differ by the node types they may contain, so older files are read as is
+SUPPORTED_VERSIONS = {1, 2}
+
+_VAL = 0
+_ABS = 1
+_APP = 2
+_GLOBAL_REF = 3
+_LOCAL_REF = 4
+_FIX = 5
+
+
+class SerializationError(Exception):
+    pass
+
+
+def _write_varint(out: bytearray, value: int):
+    assert value >= 0
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+class _Reader(object):
+    def __init__(self, buffer, position: int = 0):
+        self._buffer = buffer
+        self.position = position
+
+    def byte(self) -> int:
+        try:
+            value = self._buffer[self.position]
+        except IndexError:
+            raise SerializationError('Unexpected end of data at %d' % self.position)
+        self.position += 1
+        return value
+
+    def varint(self) -> int:
+        result = 0
+        shift = 0
+        while True:
+            value = self.byte()
+            result |= (value & 0x7f) << shift
+            if value < 0x80:
+                return result
+            shift += 7
+
+    def bytes(self, length: int) -> bytes:
+        if self.position + length > len(self._buffer):
+            raise SerializationError('Unexpected end of data at %d' % self.position)
+        value = bytes(self._buffer[self.position:self.position + length])
+        self.position += length
+        return value
+
+
+class _StringTable(object):
+    def __init__(self):
+        self.strings: typing.List[str] = []
+        self._numbers: typing.Dict[str, int] = {}
+
+    def number(self, value) -> int:
+        value = str(value)
+        if value not in self._numbers:
+            self._numbers[value] = len(self.strings)
+            self.strings.append(value)
+        return self._numbers[value]
+
+
+def _encode(expr: Def, strings: _StringTable) -> bytes:
+    out = bytearray()
+    stack = [expr]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Val):
+            out.append(_VAL)
+            _write_varint(out, strings.number(node._identifier))
+            _write_varint(out, node._index)
+        elif isinstance(node, Abs):
+            out.append(_ABS)
+            _write_varint(out, strings.number(node._identifier))
+            stack.append(node._body)
+        elif isinstance(node, Fix):
+            out.append(_FIX)
+            _write_varint(out, strings.number(node._identifier))
+            stack.append(node._body)
+        elif isinstance(node, App):
+            out.append(_APP)
+            stack.append(node._n)
+            stack.append(node._m)
+        elif isinstance(node, GlobalRef):
+            out.append(_GLOBAL_REF)
+            _write_varint(out, strings.number(node._absolute_identifier.namespace_identifier))
+            _write_varint(out, strings.number(node._absolute_identifier.relative_identifier))
+        elif isinstance(node, LocalRef):
+            out.append(_LOCAL_REF)
+            _write_varint(out, strings.number(node._relative_identifier))
+        else:
+            raise SerializationError('Can not serialize %s' % node.__class__.__name__)
+    return bytes(out)
+
+
+def _decode(reader: _Reader, strings: typing.List[str]) -> Def:
+    def string(number: int) -> str:
+        if number >= len(strings):
+            raise SerializationError('No string #%d' % number)
+        return strings[number]
+
+    # Frames of nodes still waiting for their children: [tag, identifier, children]
+    stack: typing.List[list] = []
+    while True:
+        tag = reader.byte()
+        if tag == _VAL:
+            identifier = RelativeIdentifier(string(reader.varint()))
+            node = Val(identifier, reader.varint())
+        elif tag == _GLOBAL_REF:
+            namespace_identifier = NamespaceIdentifier(string(reader.varint()))
+            node = GlobalRef(AbsoluteIdentifier(namespace_identifier, RelativeIdentifier(string(reader.varint()))))
+        elif tag == _LOCAL_REF:
+            node = LocalRef(RelativeIdentifier(string(reader.varint())))
+        elif tag == _ABS or tag == _FIX:
+            stack.append([tag, RelativeIdentifier(string(reader.varint())), []])
+            continue
+        elif tag == _APP:
+            stack.append([tag, None, []])
+            continue
+        else:
+            raise SerializationError('Unknown tag %d at %d' % (tag, reader.position - 1))
+        while stack:
+            frame = stack[-1]
+            frame[2].append(node)
+            if frame[0] == _ABS:
+                node = Abs(frame[1], node)
+            elif frame[0] == _FIX:
+                node = Fix(frame[1], node)
+            elif len(frame[2]) == 2:
+                node = App(*frame[2])
+            else:
+                break
+            stack.pop()
+        else:
+            return node
+
+
+def _read_header(reader: _Reader) -> typing.Tuple[typing.List[str], typing.List[typing.Optional[str]], typing.List[int]]:
+    """
+    :returns: String table, labels and offsets of node streams
+    """
+    if reader.bytes(len(MAGIC)) != MAGIC:
+        raise SerializationError('Not a serialized lcalc term')
+    version = reader.varint()
+    if version not in SUPPORTED_VERSIONS:
+        raise SerializationError('Unsupported version %d' % version)
+    strings = [reader.bytes(reader.varint()).decode('utf-8') for _ in range(reader.varint())]
+    labels = []
+    lengths = []
+    for _ in range(reader.varint()):
+        label = reader.varint()
+        if label > len(strings):
+            raise SerializationError('No string #%d' % (label - 1))
+        labels.append(strings[label - 1] if label else None)
+        lengths.append(reader.varint())
+    offsets = []
+    offset = reader.position
+    for length in lengths:
+        offsets.append(offset)
+        offset += length
+    return strings, labels, offsets
+
+
+def dumps(terms: typing.Sequence[Def], labels: typing.Optional[typing.Sequence[typing.Optional[str]]] = None) -> bytes:
+    """
+    :param labels: Optional names of the terms, e.g. of the definitions they are bodies of
+    """
+    if labels is None:
+        labels = [None] * len(terms)
+    if len(labels) != len(terms):
+        raise ValueError('Got %d labels for %d terms' % (len(labels), len(terms)))
+    strings = _StringTable()
+    streams = [_encode(term, strings) for term in terms]
+    label_numbers = [0 if label is None else strings.number(label) + 1 for label in labels]
+    out = bytearray(MAGIC)
+    _write_varint(out, VERSION)
+    _write_varint(out, len(strings.strings))
+    for string in strings.strings:
+        encoded = string.encode('utf-8')
+        _write_varint(out, len(encoded))
+        out += encoded
+    _write_varint(out, len(streams))
+    for label_number, stream in zip(label_numbers, streams):
+        _write_varint(out, label_number)
+        _write_varint(out, len(stream))
+    for stream in streams:
+        out += stream
+    return bytes(out)
+
+
+def dump(terms: typing.Sequence[Def], fp: typing.BinaryIO, labels: typing.Optional[typing.Sequence[typing.Optional[str]]] = None):
+    fp.write(dumps(terms, labels))
+
+
+def loads(data: bytes) -> typing.List[Def]:
+    reader = _Reader(data)
+    strings, labels, offsets = _read_header(reader)
+    return [_decode(_Reader(data, offset), strings) for offset in offsets]
+
+
+def load(fp: typing.BinaryIO) -> typing.List[Def]:
+    return loads(fp.read())
+
+
+class MappedTerms(object):
+    """
+    Terms of a serialized file, decoded on access from a memory-mapped view of it.
+    Only the string table and the index are read when the file is opened.
+    """
+    def __init__(self, path: pathlib.Path):
+        with open(str(path), 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._strings, self._labels, self._offsets = _read_header(_Reader(self._mmap))
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._mmap.close()
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, index: int) -> Def:
+        return _decode(_Reader(self._mmap, self._offsets[index]), self._strings)
+
+    @property
+    def labels(self) -> typing.List[typing.Optional[str]]:
+        return list(self._labels)
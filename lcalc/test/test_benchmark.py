@@ -0,0 +1,36 @@
+import json
+import unittest
+from .. import benchmark
+from ..parser import parse_namespace
+
+
+class BenchmarkTestCase(unittest.TestCase):
+    def test_fit_exponent(self):
+        sizes = [10, 20, 40, 80]
+        self.assertAlmostEqual(2.0, benchmark.fit_exponent(sizes, [3 * size ** 2 for size in sizes]))
+        self.assertAlmostEqual(0.0, benchmark.fit_exponent(sizes, [5 for _ in sizes]))
+
+    def test_compare(self):
+        baseline = {'eval/spine': {'time': 2.0, 'memory': 1.0}}
+        self.assertEqual([], benchmark.compare({'eval/spine': {'time': 2.2, 'memory': 0.5}}, baseline))
+        self.assertEqual(
+            ['eval/spine time grows as n^3.00, baseline is n^2.00'],
+            benchmark.compare({'eval/spine': {'time': 3.0, 'memory': 1.0}, 'eval/new': {'time': 5.0}}, baseline),
+        )
+
+    def test_families_parse(self):
+        for family in benchmark.FAMILIES.values():
+            parse_namespace(family(4))
+
+    def test_run(self):
+        results = benchmark.run(sizes=[2, 4], families=['spine'], repeats=1, min_time=0)
+        self.assertEqual({'parse/spine', 'eval/spine', 'print/spine'}, set(results))
+        self.assertEqual({'time', 'memory'}, set(results['eval/spine']))
+
+    def test_baseline_covers_all(self):
+        with open(str(benchmark.BASELINE_PATH)) as f:
+            baseline = json.load(f)
+        self.assertEqual(
+            {'%s/%s' % (operation, family) for operation in benchmark.OPERATIONS for family in benchmark.FAMILIES},
+            set(baseline),
+        )
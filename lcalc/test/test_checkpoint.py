@@ -0,0 +1,103 @@
+import pathlib
+import tempfile
+import unittest
+from ..identifiers import AbsoluteIdentifier, NamespaceIdentifier, RelativeIdentifier
+from ..context import DictContext, EvalStats
+from ..checkpoint import Checkpoint, Checkpointer, CheckpointError
+from ..memo import NormalFormMemo
+from ..parser import parse_def
+from ..lcalc import church_numerals
+
+SOURCE = '''
+SUCC = λn.λf.λx.f (n f x);
+PLUS = λm.λn.m SUCC n;
+2 = λf.λx.f (f x);
+3 = SUCC 2;
+main = PLUS 3 (PLUS 2 3);
+'''
+
+
+class Interrupted(Exception):
+    pass
+
+
+class InterruptingCheckpointer(Checkpointer):
+    def __init__(self, path: pathlib.Path, every_steps: int, interrupt_after: int):
+        super(InterruptingCheckpointer, self).__init__(path, every_steps=every_steps)
+        self._interrupt_after = interrupt_after
+
+    def save(self, *args, **kwargs):
+        super(InterruptingCheckpointer, self).save(*args, **kwargs)
+        if self.saved == self._interrupt_after:
+            raise Interrupted()
+
+
+class CheckpointTestCase(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self._directory.name) / 'main.lck'
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_round_trip(self):
+        expr = parse_def('λx.λy.x y')
+        Checkpoint(expr, 'main/main', 'abc', 10, 2, 3).save(self.path)
+        checkpoint = Checkpoint.load(self.path)
+        self.assertEqual(expr, checkpoint.expr)
+        self.assertEqual(('main/main', 'abc', 10, 2, 3), (
+            checkpoint.entry_point, checkpoint.fingerprint, checkpoint.steps, checkpoint.memo_hits, checkpoint.memo_misses,
+        ))
+        self.assertEqual(['main.lck'], [path.name for path in self.path.parent.iterdir()])
+
+    def test_resume(self):
+        expected = EvalStats()
+        self.assertEqual(church_numerals[8], DictContext({'main': SOURCE}).eval(stats=expected))
+
+        with self.assertRaises(Interrupted):
+            DictContext({'main': SOURCE}).eval(checkpointer=InterruptingCheckpointer(self.path, 2, 2))
+        self.assertEqual(4, Checkpoint.load(self.path).steps)
+
+        stats = EvalStats()
+        checkpointer = Checkpointer(self.path, every_steps=2)
+        result = DictContext({'main': SOURCE}).eval(stats=stats, checkpointer=checkpointer, resume=True)
+        self.assertEqual(church_numerals[8], result)
+        self.assertEqual(expected.steps, stats.steps)
+
+    def test_resume_memo_stats(self):
+        with self.assertRaises(Interrupted):
+            DictContext({'main': SOURCE}, memo=NormalFormMemo()).eval(
+                checkpointer=InterruptingCheckpointer(self.path, 1, 3),
+            )
+        checkpoint = Checkpoint.load(self.path)
+        stats = EvalStats()
+        DictContext({'main': SOURCE}).eval(stats=stats, checkpointer=Checkpointer(self.path), resume=True)
+        self.assertEqual(checkpoint.memo_misses, stats.memo_misses)
+        self.assertGreater(stats.memo_misses, 0)
+
+    def test_no_checkpoint(self):
+        result = DictContext({'main': SOURCE}).eval(checkpointer=Checkpointer(self.path, every_steps=100), resume=True)
+        self.assertEqual(church_numerals[8], result)
+        self.assertFalse(self.path.exists())
+
+    def test_other_definitions(self):
+        with self.assertRaises(Interrupted):
+            DictContext({'main': SOURCE}).eval(checkpointer=InterruptingCheckpointer(self.path, 1, 1))
+        context = DictContext({'main': SOURCE.replace('PLUS 3', 'PLUS 2')})
+        with self.assertRaises(CheckpointError):
+            context.eval(checkpointer=Checkpointer(self.path), resume=True)
+
+    def test_other_entry_point(self):
+        with self.assertRaises(Interrupted):
+            DictContext({'main': SOURCE}).eval(checkpointer=InterruptingCheckpointer(self.path, 1, 1))
+        with self.assertRaises(CheckpointError):
+            DictContext({'main': SOURCE}).eval(
+                AbsoluteIdentifier(NamespaceIdentifier('main'), RelativeIdentifier('3')),
+                checkpointer=Checkpointer(self.path),
+                resume=True,
+            )
+
+    def test_not_a_checkpoint(self):
+        self.path.write_bytes(b'LCT\0garbage')
+        with self.assertRaises(CheckpointError):
+            Checkpoint.load(self.path)
@@ -0,0 +1,100 @@
+import unittest
+from ..identifiers import AbsoluteIdentifier, NamespaceIdentifier, RelativeIdentifier
+from ..context import DictContext, EvalStats, SizeLimitExceeded, StepLimitExceeded, _strongly_connected_components
+from ..model import GlobalRef
+from ..parser import parse_def
+from ..lcalc import church_numerals
+
+
+def _ai(namespace: str, name: str) -> AbsoluteIdentifier:
+    return AbsoluteIdentifier(NamespaceIdentifier(namespace), RelativeIdentifier(name))
+
+
+SOURCE = '''
+0 = λf.λx.x;
+1 = SUCC 0;
+2 = SUCC 1;
+SUCC = λn.λf.λx.f (n f x);
+PLUS = λm.λn.m SUCC n;
+GROW = (λx.x x x) (λx.x x x);
+LOOP = λn.LOOP n;
+EVEN = λn.n ODD;
+ODD = λn.n EVEN;
+main = PLUS 2 1;
+'''
+
+
+class PrenormalizeTestCase(unittest.TestCase):
+    def test_normalized_bodies(self):
+        context = DictContext({'main': SOURCE}, prenormalize=True, prenormalize_steps=100)
+        self.assertEqual(church_numerals[2], context.get_def(_ai('main', '2')))
+        self.assertEqual(church_numerals[3], context.get_def(_ai('main', 'main')))
+
+    def test_cycles_skipped(self):
+        context = DictContext({'main': SOURCE}, prenormalize=True, prenormalize_steps=100)
+        for name in ['LOOP', 'EVEN', 'ODD']:
+            self.assertEqual(
+                context.get_namespace(NamespaceIdentifier('main')).get_source_def(RelativeIdentifier(name)),
+                context.get_def(_ai('main', name)),
+            )
+
+    def test_non_terminating_skipped(self):
+        context = DictContext({'main': SOURCE}, prenormalize=True, prenormalize_steps=10)
+        self.assertEqual(parse_def('(λx.x x x) (λx.x x x)'), context.get_def(_ai('main', 'GROW')))
+
+    def test_same_result(self):
+        self.assertEqual(
+            DictContext({'main': SOURCE}).eval(),
+            DictContext({'main': SOURCE}, prenormalize=True, prenormalize_steps=100).eval(),
+        )
+
+    def test_step_limit(self):
+        context = DictContext({'main': SOURCE})
+        with self.assertRaises(StepLimitExceeded):
+            context.normalize(GlobalRef(_ai('main', 'GROW')), max_steps=10)
+
+    def test_size_limit(self):
+        context = DictContext({'main': SOURCE})
+        with self.assertRaises(SizeLimitExceeded) as raised:
+            context.normalize(GlobalRef(_ai('main', 'GROW')), max_size=100)
+        self.assertLess(raised.exception.steps, 50)
+
+    def test_growing_skipped(self):
+        context = DictContext({'main': SOURCE}, prenormalize=True, prenormalize_steps=10 ** 6, prenormalize_size=100)
+        self.assertEqual(parse_def('(λx.x x x) (λx.x x x)'), context.get_def(_ai('main', 'GROW')))
+        self.assertEqual(church_numerals[3], context.get_def(_ai('main', 'main')))
+
+    def test_dependency_graph(self):
+        graph = DictContext({'main': SOURCE}).dependency_graph()
+        self.assertEqual({_ai('main', 'SUCC'), _ai('main', '1')}, graph[_ai('main', '2')])
+        self.assertEqual(set(), graph[_ai('main', 'SUCC')])
+
+    def test_strongly_connected_components(self):
+        a, b, c, d = (_ai('main', name) for name in 'abcd')
+        components = _strongly_connected_components({a: {b}, b: {c}, c: {b, d}, d: set()})
+        self.assertEqual([[d], {b, c}, [a]], [components[0], set(components[1]), components[2]])
+
+
+class IterEvalTestCase(unittest.TestCase):
+    def test_steps(self):
+        context = DictContext({'main': SOURCE})
+        stats = EvalStats()
+        steps = list(context.iter_eval(stats=stats))
+        self.assertEqual(list(range(1, len(steps) + 1)), [step.step for step in steps])
+        self.assertEqual(len(steps), stats.steps)
+        self.assertEqual(context.eval(), steps[-1].term)
+        self.assertEqual([step.term.size for step in steps], [step.size for step in steps])
+
+    def test_stop_early(self):
+        context = DictContext({'main': SOURCE})
+        stats = EvalStats()
+        for step in context.iter_eval(_ai('main', 'GROW'), stats=stats):
+            if step.size > 1000:
+                break
+        self.assertEqual(step.step, stats.steps)
+        self.assertGreater(step.size, 1000)
+
+    def test_lazy(self):
+        context = DictContext({'main': SOURCE})
+        step = next(context.iter_eval())
+        self.assertEqual('<EvalStep 1, size 15>', repr(step))
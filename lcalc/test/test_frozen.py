@@ -0,0 +1,136 @@
+import concurrent.futures
+import inspect
+import sys
+import unittest
+from ..identifiers import AbsoluteIdentifier, NamespaceIdentifier, RelativeIdentifier
+from ..context import DictContext, EvalStats, FrozenContext
+from ..memo import NormalFormMemo
+from ..optimizer import Optimizer
+from ..benchmark import recursive_program
+from ..lcalc import church_numerals, _ChurchNumerals
+
+SOURCE = '''
+import prelude;
+SQUARE = λn.prelude/MULT n n;
+main = prelude/PLUS (SQUARE prelude/3) prelude/1;
+four = prelude/SUCC prelude/3;
+sum = letrec rec = λn.prelude/ISZERO n prelude/0 (prelude/PLUS n (rec (prelude/PRED n))) in rec prelude/3;
+'''
+
+ENTRY_POINTS = {
+    'main': 10,
+    'four': 4,
+    'sum': 6,
+}
+
+
+def _ai(name: str) -> AbsoluteIdentifier:
+    return AbsoluteIdentifier(NamespaceIdentifier('main'), RelativeIdentifier(name))
+
+
+class FrozenContextTestCase(unittest.TestCase):
+    def test_same_result(self):
+        context = DictContext({'main': SOURCE})
+        frozen = context.freeze()
+        for name, value in ENTRY_POINTS.items():
+            self.assertEqual(church_numerals[value], frozen.eval(_ai(name)))
+        self.assertIs(frozen, frozen.freeze())
+
+    def test_immutable(self):
+        frozen = DictContext({'main': SOURCE}, prenormalize=True).freeze()
+        with self.assertRaises(Exception):
+            frozen.link()
+        with self.assertRaises(Exception):
+            frozen.prenormalize()
+        with self.assertRaises(Exception):
+            frozen.invalidate([NamespaceIdentifier('main')])
+        with self.assertRaises(Exception):
+            frozen.get_namespace(NamespaceIdentifier('main')).set_normalized(RelativeIdentifier('main'), church_numerals[0])
+        with self.assertRaises(TypeError):
+            frozen._namespaces[NamespaceIdentifier('other')] = None
+        with self.assertRaises(Exception):
+            frozen.get_def(_ai('missing'))
+
+    def test_snapshot(self):
+        context = DictContext({'main': SOURCE}, prenormalize=True)
+        frozen = context.freeze()
+        context.invalidate([NamespaceIdentifier('main')])
+        self.assertEqual(church_numerals[10], frozen.get_def(_ai('main')))
+
+    def test_optimizer(self):
+        with self.assertRaises(Exception):
+            FrozenContext(DictContext({'main': SOURCE}, optimizer=Optimizer(between_rounds=True)))
+        context = DictContext({'main': SOURCE}, optimizer=Optimizer())
+        frozen = context.freeze()
+        self.assertIsNone(frozen.optimizer)
+        self.assertEqual(context.eval(), frozen.eval())
+
+    def test_signatures(self):
+        for name in ['link', 'invalidate', 'optimize', 'prenormalize']:
+            self.assertEqual(
+                inspect.signature(getattr(DictContext, name)),
+                inspect.signature(getattr(FrozenContext, name)),
+            )
+
+    def test_memo(self):
+        memo = NormalFormMemo()
+        context = DictContext({'main': SOURCE}, memo=memo)
+        context.eval()
+        frozen = context.freeze()
+        stats = EvalStats()
+        self.assertEqual(church_numerals[10], frozen.eval(stats=stats))
+        self.assertEqual(1, stats.memo_hits)
+        self.assertEqual(len(memo), len(frozen.memo))
+        frozen.eval(_ai('four'))
+        self.assertEqual(len(memo), len(frozen.memo))
+
+
+class ConcurrentEvaluationTestCase(unittest.TestCase):
+    def setUp(self):
+        self._switch_interval = sys.getswitchinterval()
+        # Switch threads as often as possible to make races show up
+        sys.setswitchinterval(1e-6)
+
+    def tearDown(self):
+        sys.setswitchinterval(self._switch_interval)
+
+    def test_stress(self):
+        memo = NormalFormMemo()
+        context = DictContext({
+            'main': SOURCE,
+            'numeral': recursive_program('numeral', 3, letrec=True),
+        }, memo=memo)
+        context.eval(_ai('four'))
+        frozen = context.freeze()
+        tasks = [
+            (_ai(name), value)
+            for name, value in ENTRY_POINTS.items()
+        ] + [
+            (AbsoluteIdentifier(NamespaceIdentifier('numeral'), RelativeIdentifier('main')), 3),
+        ]
+
+        def evaluate(index: int):
+            absolute_identifier, value = tasks[index % len(tasks)]
+            stats = EvalStats()
+            return absolute_identifier, frozen.eval(absolute_identifier, stats=stats), value, stats
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(evaluate, range(200)))
+        for absolute_identifier, result, value, stats in results:
+            self.assertEqual(church_numerals[value], result)
+            # Memo counters are per thread, so other evaluations do not show up in the statistics
+            self.assertEqual(1 if absolute_identifier == _ai('four') else 0, stats.memo_hits)
+        self.assertEqual(1, len(memo))
+        self.assertEqual(1, len(frozen.memo))
+
+    def test_church_numerals(self):
+        numerals = _ChurchNumerals()
+
+        def numeral(value: int):
+            return numerals[value]
+
+        values = [value % 97 for value in range(2000)]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(numeral, values))
+        for value, result in zip(values, results):
+            self.assertEqual(church_numerals[value], result)
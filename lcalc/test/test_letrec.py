@@ -0,0 +1,116 @@
+import unittest
+from ..context import DictContext
+from ..model import Abs, App, Fix
+from ..parser import parse_def
+from ..printer import to_string
+from ..profiler import Profiler
+from ..optimizer import Optimizer
+from ..memo import NormalFormMemo
+from ..serialization import dumps, loads
+from ..benchmark import recursive_program
+from ..lcalc import church_numerals
+
+
+class LetTestCase(unittest.TestCase):
+    def test_let(self):
+        self.assertEqual(parse_def('(λx.x x) λy.y'), parse_def('let x = λy.y in x x'))
+
+    def test_let_scope(self):
+        self.assertEqual(parse_def('λx.(λy.y x) x'), parse_def('λx.let y = x in y x'))
+
+    def test_keywords(self):
+        self.assertEqual(parse_def('λx.x'), parse_def('λinc.inc'))
+        self.assertEqual(parse_def('f ((λx.x) a) b'), parse_def('f (let x = a in x) b'))
+        self.assertEqual(parse_def('(λx.x) a'), parse_def('let x = a in(x)'))
+        self.assertEqual(parse_def('(λx.x) a'), parse_def('let x=a in{}x'))
+
+    def test_keywords_as_identifiers(self):
+        self.assertEqual(parse_def('λx.x'), parse_def('λin.in'))
+        self.assertEqual(parse_def('λx.x y'), parse_def('λlet.let y'))
+        self.assertEqual(parse_def('(λx.x) λy.y'), parse_def('let in = λy.y in in'))
+        self.assertEqual(parse_def('(λx.x) λy.y'), parse_def('let x = λin.(in) in x'))
+        context = DictContext({'main': 'in = λx.x;\nletrec = in;\nmain = letrec in;\n'})
+        self.assertEqual(parse_def('λx.x'), context.eval())
+
+    def test_letrec(self):
+        expr = parse_def('letrec f = λn.f n in f')
+        self.assertIsInstance(expr, Fix)
+        self.assertEqual(0, expr.free_bound)
+        self.assertTrue(expr._body.bound_to(0))
+
+    def test_letrec_body(self):
+        expr = parse_def('letrec f = λn.f n in f a')
+        self.assertIsInstance(expr, App)
+        self.assertIsInstance(expr._m, Abs)
+        self.assertIsInstance(expr._n, Fix)
+
+    def test_print(self):
+        for source in [
+            'letrec f = λn.f n in f',
+            '(letrec f = λn.f n in f) a',
+            'λx.letrec g = λy.g x in g',
+        ]:
+            self.assertEqual(source, to_string(parse_def(source)))
+
+    def test_serialization(self):
+        expr = parse_def('λx.letrec g = λy.g (x y) in g')
+        self.assertEqual([expr], loads(dumps([expr])))
+
+
+class FixTestCase(unittest.TestCase):
+    def test_unroll_shared(self):
+        fix = parse_def('letrec f = λn.f n in f')
+        unrolled = fix.unroll()
+        self.assertIs(unrolled, fix.unroll())
+        self.assertIs(fix, unrolled._body._m)
+
+    def test_open_unroll(self):
+        fix = parse_def('λx.letrec g = λy.g x in g')._body
+        self.assertEqual(1, fix.free_bound)
+        self.assertEqual(parse_def('λx.λy.(letrec g = λy.g x in g) x')._body, fix.unroll())
+        self.assertIsNot(fix.unroll(), fix.unroll())
+
+    def test_normal_form(self):
+        context = DictContext({'main': 'main = letrec f = λn.f n in f;'})
+        self.assertEqual(parse_def('letrec f = λn.f n in f'), context.eval())
+
+    def test_recursion(self):
+        for function in ['numeral', 'list']:
+            context = DictContext({'main': recursive_program(function, 3, letrec=True)})
+            self.assertEqual(church_numerals[3], context.eval())
+
+    def test_same_as_fixpoint(self):
+        self.assertEqual(
+            DictContext({'main': recursive_program('numeral', 4, letrec=False)}).eval(),
+            DictContext({'main': recursive_program('numeral', 4, letrec=True)}).eval(),
+        )
+
+    def test_unselected_branch_not_unrolled(self):
+        sizes = {}
+        for letrec in [False, True]:
+            context = DictContext({'main': recursive_program('list', 6, letrec=letrec)})
+            sizes[letrec] = max(step.size for step in context.iter_eval())
+        self.assertLess(sizes[True] * 4, sizes[False])
+
+    def test_memo(self):
+        for function in ['numeral', 'list']:
+            context = DictContext({'main': recursive_program(function, 3, letrec=True)}, memo=NormalFormMemo())
+            self.assertEqual(church_numerals[3], context.eval())
+            self.assertEqual(church_numerals[3], context.eval())
+
+    def test_open_recursion(self):
+        context = DictContext({'main': '''
+            import prelude;
+            main = (λx.letrec g = λy.prelude/ISZERO y x (g (prelude/PRED y)) in g) prelude/3 prelude/2;
+        '''})
+        self.assertEqual(church_numerals[3], context.eval())
+
+    def test_profiler(self):
+        source = recursive_program('numeral', 2, letrec=True)
+        profiler = Profiler()
+        self.assertEqual(church_numerals[2], DictContext({'main': source}).eval(profiler=profiler))
+        self.assertIn('main/main', profiler.summary())
+
+    def test_optimizer(self):
+        source = recursive_program('list', 2, letrec=True)
+        self.assertEqual(church_numerals[2], DictContext({'main': source}, optimizer=Optimizer()).eval())
@@ -0,0 +1,115 @@
+import pathlib
+import tempfile
+import unittest
+from ..identifiers import AbsoluteIdentifier, NamespaceIdentifier, RelativeIdentifier
+from ..context import DictContext, EvalStats
+from ..memo import NormalFormMemo
+from ..parser import parse_def
+from ..lcalc import church_numerals
+
+SOURCE = '''
+SUCC = λn.λf.λx.f (n f x);
+PLUS = λm.λn.m SUCC n;
+2 = λf.λx.f (f x);
+3 = SUCC 2;
+5 = PLUS 2 3;
+main = PLUS 5 5;
+PAIR = λa.λb.λs.s a b;
+pair = PAIR (PLUS 2 3) (PLUS 3 3);
+6 = SUCC (PLUS 2 3);
+'''
+
+
+def _ai(name: str) -> AbsoluteIdentifier:
+    return AbsoluteIdentifier(NamespaceIdentifier('main'), RelativeIdentifier(name))
+
+
+class NormalFormMemoTestCase(unittest.TestCase):
+    def test_lru_eviction(self):
+        memo = NormalFormMemo(max_size=2)
+        a, b, c = parse_def('λx.x'), parse_def('λx.λy.x'), parse_def('λx.λy.y')
+        memo.put(a, a)
+        memo.put(b, b)
+        memo.get(a)
+        memo.put(c, c)
+        self.assertEqual(2, len(memo))
+        self.assertIsNone(memo.get(b))
+        self.assertEqual(a, memo.get(a))
+        self.assertEqual(2, memo.hits)
+        self.assertEqual(1, memo.misses)
+
+    def test_open_terms_not_stored(self):
+        memo = NormalFormMemo()
+        memo.put(parse_def('λx.x')._body, parse_def('λx.x'))
+        self.assertEqual(0, len(memo))
+
+    def test_eval(self):
+        memo = NormalFormMemo()
+        context = DictContext({'main': SOURCE}, memo=memo)
+        stats = EvalStats()
+        self.assertEqual(church_numerals[10], context.eval(stats=stats))
+        self.assertGreater(stats.steps, 0)
+        self.assertGreater(stats.memo_misses, 0)
+        second = EvalStats()
+        self.assertEqual(church_numerals[10], context.eval(stats=second))
+        self.assertEqual(1, second.memo_hits)
+        self.assertLess(second.steps, stats.steps)
+        self.assertEqual(DictContext({'main': SOURCE}).eval(), context.eval())
+
+    def test_subterms(self):
+        memo = NormalFormMemo()
+        context = DictContext({'main': SOURCE}, memo=memo)
+        context.eval(_ai('pair'))
+        self.assertEqual(church_numerals[5], memo.get(parse_def('PLUS 2 3').link(NamespaceIdentifier('main'))))
+        self.assertEqual(church_numerals[6], memo.get(parse_def('PLUS 3 3').link(NamespaceIdentifier('main'))))
+        stats = EvalStats()
+        self.assertEqual(church_numerals[6], context.eval(_ai('6'), stats=stats))
+        self.assertEqual(1, stats.memo_hits)
+
+    def test_reducts_not_looked_up(self):
+        stats = EvalStats()
+        DictContext({'main': SOURCE}, memo=NormalFormMemo()).eval(stats=stats)
+        self.assertLess(stats.memo_misses, stats.steps)
+
+    def test_clear(self):
+        memo = NormalFormMemo()
+        context = DictContext({'main': SOURCE}, memo=memo)
+        context.eval()
+        context.invalidate([NamespaceIdentifier('main')])
+        self.assertEqual(0, len(memo))
+        stats = EvalStats()
+        self.assertEqual(church_numerals[10], context.eval(stats=stats))
+        self.assertEqual(0, stats.memo_hits)
+
+    def test_persistence(self):
+        context = DictContext({'main': SOURCE}, memo=NormalFormMemo())
+        context.eval()
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory) / 'memo'
+            context.memo.save(path, context.fingerprint())
+
+            loaded = DictContext({'main': SOURCE}, memo=NormalFormMemo())
+            self.assertTrue(loaded.memo.load(path, loaded.fingerprint()))
+            stats = EvalStats()
+            self.assertEqual(church_numerals[10], loaded.eval(stats=stats))
+            self.assertEqual(1, stats.memo_hits)
+
+            changed = DictContext({'main': SOURCE.replace('main = PLUS 5 5', 'main = PLUS 5 3')}, memo=NormalFormMemo())
+            self.assertFalse(changed.memo.load(path, changed.fingerprint()))
+
+    def test_unreadable(self):
+        context = DictContext({'main': SOURCE}, memo=NormalFormMemo())
+        context.eval()
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory) / 'memo'
+            context.memo.save(path, context.fingerprint())
+            saved = path.read_bytes()
+            stale = saved.replace(b'"version": 1', b'"version": 0')
+            self.assertNotEqual(saved, stale)
+            for data in [b'', b'garbage', saved[:len(saved) // 2], stale, b'\x80\x04\x95\x00N.']:
+                path.write_bytes(data)
+                loaded = DictContext({'main': SOURCE}, memo=NormalFormMemo())
+                with self.assertLogs(level='WARNING'):
+                    self.assertFalse(loaded.memo.load(path, loaded.fingerprint()))
+                self.assertEqual(0, len(loaded.memo))
+                self.assertEqual(church_numerals[10], loaded.eval())
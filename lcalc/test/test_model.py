@@ -1,6 +1,11 @@
 import unittest
 from ..identifiers import AbsoluteIdentifier, NamespaceIdentifier, RelativeIdentifier
-from ..model import GlobalRef
+from ..model import GlobalRef, Val, Abs, App, LnBound, LnFree, LnAbs, LnApp, to_locally_nameless, from_locally_nameless
+from ..parser import parse_def
+from ..context import DictContext
+from ..optimizer import Optimizer, SmallDefinitionInlining, DeadBinderPruning, EtaReduction
+from ..printer import to_string
+from ..benchmark import FAMILIES, recursive_program
 
 
 class GlobalRefTest(unittest.TestCase):
@@ -15,3 +20,146 @@ class GlobalRefTest(unittest.TestCase):
             f'{namespace_identifier}/{relative_name}',
             global_ref.__str__(comment=False)
         )
+
+
+class FreeBoundTest(unittest.TestCase):
+    def test_free_bound(self):
+        self.assertEqual(0, parse_def('λx.λy.x y').free_bound)
+        self.assertEqual(1, Abs(RelativeIdentifier('y'), App(Val(RelativeIdentifier('x'), 1), Val(RelativeIdentifier('y'), 0))).free_bound)
+        self.assertEqual(3, App(Val(RelativeIdentifier('x'), 2), Val(RelativeIdentifier('y'), 0)).free_bound)
+
+    def test_size(self):
+        self.assertEqual(1, parse_def('x').size)
+        self.assertEqual(5, parse_def('λx.λy.x y').size)
+
+    def test_closed_subterm_shared(self):
+        closed = parse_def('λx.λy.x y')
+        self.assertIs(closed, closed.shift(5))
+        self.assertIs(closed, closed.substitute(parse_def('λz.z')))
+        expr = App(closed, Val(RelativeIdentifier('a'), 0))
+        self.assertIs(closed, expr.shift(1)._m)
+        self.assertIs(closed, expr.substitute(parse_def('λz.z'))._m)
+
+    def test_shift_below_cutoff(self):
+        expr = App(Val(RelativeIdentifier('x'), 0), Val(RelativeIdentifier('y'), 1))
+        self.assertIs(expr, expr.shift(1, 2))
+        self.assertIs(expr, expr.substitute(parse_def('λz.z'), 2))
+
+
+class HashTest(unittest.TestCase):
+    def test_alpha_equivalent(self):
+        self.assertEqual(hash(parse_def('λx.λy.x y')), hash(parse_def('λa.λb.a b')))
+        self.assertNotEqual(hash(parse_def('λx.λy.x y')), hash(parse_def('λx.λy.y x')))
+
+    def test_dict_key(self):
+        table = {parse_def('λx.x'): 'id'}
+        self.assertEqual('id', table[parse_def('λy.y')])
+
+
+class EtaTest(unittest.TestCase):
+    def test_eta(self):
+        self.assertEqual(parse_def('λf.f'), parse_def('λf.λx.f x').eta())
+        self.assertEqual(parse_def('λx.x x'), parse_def('λx.x x').eta())
+        self.assertEqual(parse_def('λy.y'), parse_def('λy.λx.(λz.y z) x').eta())
+
+    def test_eta_shifts(self):
+        self.assertEqual(
+            Abs(RelativeIdentifier('y'), Val(RelativeIdentifier('a'), 1)),
+            Abs(RelativeIdentifier('y'), Abs(RelativeIdentifier('x'), App(Val(RelativeIdentifier('a'), 2), Val(RelativeIdentifier('x'), 0)))).eta(),
+        )
+
+    def test_bound_to(self):
+        expr = parse_def('λx.λy.x')
+        self.assertTrue(expr._body.bound_to(0))
+        self.assertFalse(expr._body._body.bound_to(0))
+        self.assertTrue(expr._body._body.bound_to(1))
+
+
+def _ln(source: str):
+    return to_locally_nameless(parse_def(source))
+
+
+class LocallyNamelessTest(unittest.TestCase):
+    def test_comment(self):
+        self.assertEqual(_ln('{}\\{}x{}.{}x{}'), _ln('\\x.x'))
+
+    def test_alpha_equiv(self):
+        self.assertEqual(_ln('\\x.x'), _ln('\\y.y'))
+
+    def test_alpha_equiv2(self):
+        self.assertEqual(_ln('\\x.\\x.x'), _ln('\\x.\\y.y'))
+        self.assertNotEqual(_ln('\\x.\\x.x'), _ln('\\x.\\y.x'))
+
+    def test_brackets(self):
+        self.assertEqual(_ln('\\x.x'), _ln('\\y.(y)'))
+
+    def test_bracketsless_app(self):
+        self.assertEqual(_ln('\\x.\\y.x y'), _ln('\\x.\\y.(x y)'))
+        self.assertEqual(_ln('\\x.\\y.\\z.x y z'), _ln('\\x.\\y.\\z.((x y) z)'))
+
+    def test_0(self):
+        self.assertEqual(
+            LnAbs('x', LnApp(LnAbs('z', LnBound('z', 0)), LnBound('x', 0))),
+            _ln('λx.(λz.z) x'),
+        )
+
+    def test_round_trip(self):
+        for source in ['λx.λy.x (λz.z y)', 'λf.letrec g = λn.f (g n) in g', 'λx.a/b x']:
+            expr = parse_def(source)
+            self.assertEqual(expr, from_locally_nameless(to_locally_nameless(expr)))
+
+    def test_open_terms(self):
+        body = parse_def('λx.λy.x (λz.z y)')._body
+        converted = to_locally_nameless(body)
+        self.assertEqual(LnFree('x', 0), converted._body._m)
+        self.assertEqual(body, from_locally_nameless(converted))
+
+    def test_closed_argument_not_copied(self):
+        argument = _ln('λa.λb.b a')
+        redex = LnApp(_ln('λx.λy.y x x'), argument)
+        result = redex.beta(None)
+        self.assertIs(argument, result._body._m._n)
+        self.assertIs(argument, result._body._n)
+
+    def test_normalize(self):
+        sources = [family(16) for family in FAMILIES.values()] + [
+            recursive_program('numeral', 3, letrec=True),
+            recursive_program('list', 3, letrec=False),
+            recursive_program('list', 3, letrec=True),
+        ]
+        for source in sources:
+            context = DictContext({'main': source})
+            expr = context.get_def(AbsoluteIdentifier(NamespaceIdentifier('main'), RelativeIdentifier('main')))
+            self.assertEqual(context.normalize(expr), from_locally_nameless(context.normalize(to_locally_nameless(expr))))
+
+    def test_speculative(self):
+        context = DictContext({'main': recursive_program('list', 8, letrec=True)})
+        expr = context.get_def(AbsoluteIdentifier(NamespaceIdentifier('main'), RelativeIdentifier('main')))
+        sizes = [step.size for step in context.iter_normalize(expr)]
+        ln_sizes = [step.size for step in context.iter_normalize(to_locally_nameless(expr))]
+        self.assertEqual(sizes, ln_sizes)
+
+    def test_names_kept(self):
+        expr = _ln('(λn.λf.λx.f (n f x)) ((λn.λg.λy.g (n g y)) λf.λx.f x)')
+        result = DictContext().normalize(expr)
+        self.assertEqual('λf.λx.f (f (f x))', to_string(from_locally_nameless(result), comment=False))
+
+    def test_eta(self):
+        self.assertEqual(_ln('λa.a'), _ln('λa.λx.(λy.a y) x').eta())
+        expr = _ln('λf.λx.f (f x)')
+        self.assertIs(expr, expr.eta())
+
+    def test_prune(self):
+        expr, rewrites = DeadBinderPruning().run(_ln('λz.λw.(λy.z w) w'), DictContext())
+        self.assertEqual((_ln('λz.λw.z w'), 1), (expr, rewrites))
+
+    def test_optimizer(self):
+        source = 'K = λx.λy.x;\n2 = λf.λx.f (f x);\nmain = λz.K (2 z) (2 2) (λx.z x);\n'
+        optimizer = Optimizer([SmallDefinitionInlining(), DeadBinderPruning(), EtaReduction()], between_rounds=True)
+        context = DictContext({'main': source}, optimizer=optimizer)
+        expr = context.get_def(AbsoluteIdentifier(NamespaceIdentifier('main'), RelativeIdentifier('main')))
+        rewrites = optimizer.report['prune'].rewrites
+        result = from_locally_nameless(context.normalize(to_locally_nameless(expr)))
+        self.assertGreater(optimizer.report['prune'].rewrites, rewrites)
+        self.assertEqual(context.normalize(expr), result)
+        self.assertEqual(to_locally_nameless(result), EtaReduction().run(to_locally_nameless(result), context)[0])
@@ -0,0 +1,93 @@
+import unittest
+from ..identifiers import AbsoluteIdentifier, NamespaceIdentifier, RelativeIdentifier
+from ..context import DictContext, EvalStats
+from ..model import Val, Abs, App
+from ..optimizer import Optimizer, DeadBinderPruning, SmallDefinitionInlining, EtaReduction
+from ..parser import parse_def
+from ..lcalc import church_numerals
+from ..benchmark import measure_steps_saved
+
+SOURCE = '''
+SUCC = λn.λf.λx.f (n f x);
+PLUS = λm.λn.m SUCC n;
+K = λx.λy.x;
+G = λn.n G;
+2 = λf.λx.f (f x);
+main = K (PLUS 2 2) (PLUS 2 2);
+'''
+
+
+def _def(context, name):
+    return context.get_def(AbsoluteIdentifier(NamespaceIdentifier('main'), RelativeIdentifier(name)))
+
+
+class OptimizerTestCase(unittest.TestCase):
+    def test_prune(self):
+        optimizer = Optimizer([DeadBinderPruning()])
+        self.assertEqual(parse_def('λa.a'), optimizer.run(parse_def('(λx.λa.a) (λb.b b)'), None))
+        self.assertEqual(parse_def('λa.(λx.x) a'), optimizer.run(parse_def('λa.(λx.x) a'), None))
+        self.assertEqual(1, optimizer.report['prune'].rewrites)
+        self.assertEqual(6, optimizer.report['prune'].size_saved)
+
+    def test_inline(self):
+        context = DictContext({'main': SOURCE}, optimizer=Optimizer([SmallDefinitionInlining(max_size=10)]))
+        namespace = context.get_namespace(NamespaceIdentifier('main'))
+        self.assertEqual(
+            set(),
+            {'K', 'PLUS', '2'} & {str(reference.relative_identifier) for reference in _def(context, 'main').global_references()},
+        )
+        self.assertEqual(namespace.get_source_def(RelativeIdentifier('G')), _def(context, 'G'))
+
+    def test_eta(self):
+        optimizer = Optimizer([EtaReduction()])
+        self.assertEqual(parse_def('λf.f'), optimizer.run(church_numerals[1], None))
+        self.assertEqual(1, optimizer.report['eta'].rewrites)
+        self.assertEqual(3, optimizer.report['eta'].size_saved)
+
+    def test_eta_unchanged(self):
+        expr = parse_def('λf.λx.f (f x)')
+        self.assertIs(expr, EtaReduction().run(expr, None)[0])
+
+    def test_eval(self):
+        stats = EvalStats()
+        DictContext({'main': SOURCE}).eval(stats=stats)
+        optimized_stats = EvalStats()
+        optimizer = Optimizer()
+        context = DictContext({'main': SOURCE}, optimizer=optimizer)
+        self.assertEqual(church_numerals[4], context.eval(stats=optimized_stats))
+        self.assertLess(optimized_stats.steps, stats.steps)
+        self.assertGreater(optimizer.report['inline'].rewrites, 0)
+
+    def test_between_rounds(self):
+        optimizer = Optimizer(between_rounds=True)
+        context = DictContext({'main': SOURCE}, optimizer=optimizer)
+        self.assertEqual(church_numerals[4], context.eval())
+        self.assertGreater(optimizer.report['prune'].rewrites, 0)
+
+    def test_eval_keeps_normal_form(self):
+        source = '1 = λf.λx.f x;\nmain = 1;\n'
+        self.assertEqual(church_numerals[1], DictContext({'main': source}, optimizer=Optimizer()).eval())
+
+    def test_eta_definitions_only(self):
+        optimizer = Optimizer([EtaReduction()], between_rounds=True)
+        context = DictContext({'main': SOURCE}, optimizer=optimizer)
+        runs = optimizer.report['eta'].runs
+        self.assertEqual(church_numerals[4], context.eval())
+        self.assertEqual(runs, optimizer.report['eta'].runs)
+
+    def test_deep_expression(self):
+        expr = App(Abs('y', Val('x', 1)), Val('x', 0))
+        for _ in range(10000):
+            expr = App(Val('x', 0), expr)
+        expr = Abs('x', expr)
+        pruned, rewrites = DeadBinderPruning().run(expr, None)
+        self.assertEqual(1, rewrites)
+        self.assertEqual(expr.size - 3, pruned.size)
+
+    def test_steps_saved(self):
+        optimizer = measure_steps_saved(SOURCE)
+        self.assertEqual(2, optimizer.report['inline'].steps_saved)
+        self.assertEqual(0, optimizer.report['prune'].steps_saved)
+        optimizer = measure_steps_saved('main = (λx.λa.a) ((λb.b b) (λb.b b));\n')
+        self.assertEqual(1, optimizer.report['prune'].steps_saved)
+        self.assertIn('steps saved', optimizer.summary())
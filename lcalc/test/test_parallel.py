@@ -0,0 +1,40 @@
+import unittest
+from ..identifiers import AbsoluteIdentifier, NamespaceIdentifier, RelativeIdentifier
+from ..context import DictContext
+from ..parallel import ParallelEvaluator
+
+SOURCE = '''
+SUCC = λn.λf.λx.f (n f x);
+PLUS = λm.λn.m SUCC n;
+MULT = λm.λn.m (PLUS n) 0;
+0 = λf.λx.x;
+1 = λf.λx.f x;
+2 = λf.λx.f (f x);
+3 = SUCC 2;
+5 = PLUS 2 3;
+main = λg.g (PLUS 5 5) (MULT 3 3) (λy.y (MULT 2 5) 2);
+small = λg.g (MULT (PLUS 5 5) (PLUS 5 5)) 1;
+'''
+
+MAIN = AbsoluteIdentifier(NamespaceIdentifier('main'), RelativeIdentifier('main'))
+SMALL = AbsoluteIdentifier(NamespaceIdentifier('main'), RelativeIdentifier('small'))
+
+
+class ParallelEvaluatorTestCase(unittest.TestCase):
+    def test_same_result(self):
+        context = DictContext({'main': SOURCE})
+        with ParallelEvaluator(context, workers=2, threshold=1) as evaluator:
+            self.assertEqual(context.eval(MAIN), evaluator.eval(MAIN))
+
+    def test_below_threshold(self):
+        context = DictContext({'main': SOURCE}, prenormalize=True)
+        with ParallelEvaluator(context, workers=1, threshold=1000000) as evaluator:
+            self.assertEqual(context.eval(MAIN), evaluator.eval(MAIN))
+            self.assertEqual(1, evaluator.submitted)
+
+    def test_small_but_long(self):
+        context = DictContext({'main': SOURCE})
+        with ParallelEvaluator(context, workers=2, threshold=10) as evaluator:
+            self.assertEqual(context.eval(SMALL), evaluator.eval(SMALL))
+            # The expression and its two arguments, then the parts of `MULT (PLUS 5 5) (PLUS 5 5)`
+            self.assertGreater(evaluator.submitted, 3)
@@ -0,0 +1,72 @@
+import pathlib
+import subprocess
+import sys
+import tempfile
+import typing
+import unittest
+from ..identifiers import AbsoluteIdentifier, NamespaceIdentifier, RelativeIdentifier
+from ..context import DictContext, FSContext
+from ..prelude import PRELUDE, load_prelude, parse_prelude
+from ..lcalc import church_numerals
+
+
+class PreludeTestCase(unittest.TestCase):
+    def test_snapshot_up_to_date(self):
+        parsed = parse_prelude()
+        loaded = load_prelude()
+        self.assertEqual(parsed.relative_identifiers, loaded.relative_identifiers)
+        for relative_identifier in parsed.relative_identifiers:
+            self.assertEqual(parsed.get_source_def(relative_identifier), loaded.get_source_def(relative_identifier))
+
+    def test_dict_context(self):
+        context = DictContext({'main': 'import prelude;\nmain = prelude/PLUS prelude/2 prelude/3;\n'})
+        self.assertEqual(church_numerals[5], context.eval())
+
+    def test_dict_context_own_prelude(self):
+        context = DictContext({
+            'prelude': '2 = λf.λx.f (f (f x));\n',
+            'main': 'import prelude;\nmain = prelude/2;\n',
+        })
+        self.assertEqual(church_numerals[3], context.eval())
+
+    def test_fs_context(self):
+        with tempfile.TemporaryDirectory() as directory:
+            root_path = pathlib.Path(directory)
+            (root_path / 'main.lcalc').write_text('import prelude;\nmain = prelude/MULT prelude/2 prelude/3;\n')
+            context = FSContext(NamespaceIdentifier('main'), root_path)
+            self.assertEqual(church_numerals[6], context.eval())
+            self.assertIn(PRELUDE, context.source_digests)
+
+    def test_definitions(self):
+        context = DictContext({'main': 'import prelude;\nmain = prelude/HEAD (prelude/TAIL (prelude/CONS prelude/1 (prelude/CONS prelude/2 prelude/NIL)));\n'})
+        self.assertEqual(church_numerals[2], context.eval())
+        context = DictContext({'main': 'import prelude;\nmain = prelude/ISZERO prelude/0;\n'})
+        self.assertEqual(context.get_def(AbsoluteIdentifier(PRELUDE, RelativeIdentifier('TRUE'))), context.eval())
+
+
+class LazyImportTestCase(unittest.TestCase):
+    HEAVY_MODULES = [
+        'parsec', 'pickle', 'mmap',
+        'lcalc.parser', 'lcalc.memo', 'lcalc.profiler', 'lcalc.optimizer',
+        'lcalc.checkpoint', 'lcalc.prelude', 'lcalc.serialization',
+    ]
+
+    def _loaded(self, code: str) -> typing.List[str]:
+        output = subprocess.run(
+            [sys.executable, '-c', code + '\nprint(" ".join(sorted(sys.modules)))'],
+            stdout=subprocess.PIPE,
+            check=True,
+        ).stdout
+        loaded = set(output.decode('utf-8').split())
+        return [module for module in self.HEAVY_MODULES if module in loaded]
+
+    def test_context(self):
+        self.assertEqual([], self._loaded('import sys, lcalc.context'))
+
+    def test_cli_help(self):
+        self.assertEqual([], self._loaded(
+            'import sys, contextlib, io, lcalc.__main__\n'
+            'sys.argv = ["lcalc", "--help"]\n'
+            'with contextlib.suppress(SystemExit), contextlib.redirect_stdout(io.StringIO()):\n'
+            '    lcalc.__main__.main()'
+        ))
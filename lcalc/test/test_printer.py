@@ -0,0 +1,49 @@
+import io
+import unittest
+from ..identifiers import RelativeIdentifier
+from ..model import Val, Abs, App
+from ..parser import parse_def
+from ..printer import write, to_string
+
+
+class PrinterTestCase(unittest.TestCase):
+    def test_plain(self):
+        self.assertEqual('λf.λx.f (f x)', to_string(parse_def('λf.λx.f (f x)')))
+
+    def test_comment(self):
+        self.assertEqual(
+            'λf.(λx.{<-0}x) {<-0}f',
+            to_string(parse_def('λf.(λx.x) f'), comment=True),
+        )
+
+    def test_abstraction_argument(self):
+        for source in ['(a λx.x) b', 'a λx.x', 'a (λx.x) λy.y']:
+            self.assertEqual(parse_def(source), parse_def(to_string(parse_def(source))))
+        self.assertEqual('a (λx.x) b', to_string(parse_def('(a λx.x) b')))
+
+    def test_deep(self):
+        f, x = RelativeIdentifier('f'), RelativeIdentifier('x')
+        body = Val(x, 0)
+        for _ in range(20000):
+            body = App(Val(f, 1), body)
+        text = to_string(Abs(f, Abs(x, body)))
+        self.assertTrue(text.startswith('λf.λx.f (f (f'))
+        self.assertTrue(text.endswith('x' + ')' * 19999))
+
+    def test_max_length(self):
+        stream = io.StringIO()
+        self.assertFalse(write(parse_def('λf.λx.f (f x)'), stream, max_length=6))
+        self.assertEqual('λf.λx....', stream.getvalue())
+        self.assertTrue(write(parse_def('λf.λx.f (f x)'), io.StringIO(), max_length=13))
+
+    def test_share(self):
+        expr = parse_def('λg.g (λf.λx.f (f x)) (λf.λx.f (f x))')
+        self.assertEqual(
+            'let _1 = λf.λx.f (f x) in\nλg.g _1 _1',
+            to_string(expr, share=True, share_min_size=2),
+        )
+        self.assertEqual(to_string(expr), to_string(expr, share=True, share_min_size=100))
+
+    def test_share_open_subterms(self):
+        expr = parse_def('λg.g (g g) (g g)')
+        self.assertEqual('λg.g (g g) (g g)', to_string(expr, share=True, share_min_size=1))
@@ -0,0 +1,66 @@
+import io
+import unittest
+from ..identifiers import AbsoluteIdentifier, NamespaceIdentifier, RelativeIdentifier
+from ..context import DictContext, EvalStats
+from ..memo import NormalFormMemo
+from ..profiler import Profiler
+from ..lcalc import church_numerals
+
+SOURCE = '''
+ID = λx.x;
+TWICE = λf.λx.f (f x);
+SUCC = λn.λf.λx.f (n f x);
+0 = λf.λx.x;
+main = TWICE SUCC (ID 0);
+'''
+
+
+class ProfilerTestCase(unittest.TestCase):
+    def test_steps_attributed(self):
+        profiler = Profiler()
+        stats = EvalStats()
+        result = DictContext({'main': SOURCE}).eval(stats=stats, profiler=profiler)
+        self.assertEqual(church_numerals[2], result)
+        stream = io.StringIO()
+        profiler.write_collapsed(stream)
+        lines = dict(line.rsplit(' ', 1) for line in stream.getvalue().splitlines())
+        self.assertEqual('1', lines['main/main;main/ID'])
+        self.assertEqual('2', lines['main/main;main/TWICE'])
+        self.assertEqual('4', lines['main/main;main/SUCC'])
+        self.assertEqual('2', lines['main/main;main/0'])
+
+    def test_copies_not_counted(self):
+        profiler = Profiler()
+        result = DictContext({'main': 'ID = λx.x;\n0 = λf.λx.x;\nmain = ID (ID 0);\n'}).eval(profiler=profiler)
+        self.assertEqual(church_numerals[0], result)
+        stream = io.StringIO()
+        profiler.write_collapsed(stream, metric='allocations')
+        lines = dict(line.rsplit(' ', 1) for line in stream.getvalue().splitlines())
+        self.assertNotIn('main/main;main/ID', lines)
+        self.assertNotIn('main/main;main/0', lines)
+
+    def test_same_result(self):
+        context = DictContext({'main': SOURCE})
+        self.assertEqual(context.eval(), context.eval(profiler=Profiler()))
+        self.assertIsNone(context.profiler)
+
+    def test_definitions_not_tagged(self):
+        context = DictContext({'main': SOURCE})
+        context.eval(profiler=Profiler())
+        twice = context.get_def(AbsoluteIdentifier(NamespaceIdentifier('main'), RelativeIdentifier('TWICE')))
+        self.assertIsNone(twice._origin)
+
+    def test_memo(self):
+        context = DictContext({'main': SOURCE}, memo=NormalFormMemo())
+        context.eval()
+        profiler = Profiler()
+        self.assertEqual(church_numerals[2], context.eval(profiler=profiler))
+
+    def test_summary(self):
+        profiler = Profiler()
+        DictContext({'main': SOURCE}).eval(profiler=profiler)
+        lines = profiler.summary().splitlines()
+        self.assertEqual('definition', lines[0].split()[-1])
+        self.assertEqual('main/main', lines[1].split()[-1])
+        self.assertEqual(['4', '4'], lines[2].split()[:2])
+        self.assertEqual('main/SUCC', lines[2].split()[-1])
@@ -0,0 +1,65 @@
+import io
+import pathlib
+import tempfile
+import unittest
+from ..identifiers import RelativeIdentifier
+from ..model import Val, Abs, App
+from ..parser import parse_def
+from ..printer import to_string
+from ..serialization import dump, dumps, load, loads, MappedTerms, SerializationError
+
+
+class SerializationTestCase(unittest.TestCase):
+    TERMS = [
+        'λf.λx.f (f x)',
+        'λx.x lib/SUCC undefined',
+        'λa.λb.λc.(λx.x) (a (b c))',
+    ]
+
+    def test_round_trip(self):
+        terms = [parse_def(source) for source in self.TERMS]
+        loaded = loads(dumps(terms))
+        self.assertEqual(terms, loaded)
+        self.assertEqual(
+            [to_string(term, comment=True) for term in terms],
+            [to_string(term, comment=True) for term in loaded],
+        )
+
+    def test_file(self):
+        stream = io.BytesIO()
+        dump([parse_def(self.TERMS[0])], stream)
+        stream.seek(0)
+        self.assertEqual([parse_def(self.TERMS[0])], load(stream))
+
+    def test_compact(self):
+        f, x = RelativeIdentifier('f'), RelativeIdentifier('x')
+        body = Val(x, 0)
+        for _ in range(100):
+            body = App(Val(f, 1), body)
+        term = Abs(f, Abs(x, body))
+        self.assertLess(len(dumps([term])), len(to_string(term, comment=True).encode('utf-8')) / 2)
+
+    def test_deep(self):
+        f, x = RelativeIdentifier('f'), RelativeIdentifier('x')
+        body = Val(x, 0)
+        for _ in range(20000):
+            body = App(Val(f, 1), body)
+        term = Abs(f, Abs(x, body))
+        self.assertEqual(term.size, loads(dumps([term]))[0].size)
+
+    def test_mapped(self):
+        terms = [parse_def(source) for source in self.TERMS]
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory) / 'terms.lct'
+            path.write_bytes(dumps(terms, labels=['two', None, 'three']))
+            with MappedTerms(path) as mapped:
+                self.assertEqual(3, len(mapped))
+                self.assertEqual(['two', None, 'three'], mapped.labels)
+                self.assertEqual(terms[2], mapped[2])
+                self.assertEqual(terms[0], mapped[0])
+
+    def test_invalid(self):
+        with self.assertRaises(SerializationError):
+            loads(b'not a term')
+        with self.assertRaises(SerializationError):
+            loads(dumps([parse_def(self.TERMS[0])])[:-2])
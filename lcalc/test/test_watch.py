@@ -0,0 +1,96 @@
+import os
+import pathlib
+import tempfile
+import unittest
+from ..identifiers import AbsoluteIdentifier, NamespaceIdentifier, RelativeIdentifier
+from ..context import FSContext
+from ..memo import NormalFormMemo
+from ..watch import Watcher
+from ..lcalc import church_numerals
+
+MAIN = NamespaceIdentifier('main')
+LIB = NamespaceIdentifier('lib')
+OTHER = NamespaceIdentifier('other')
+
+
+class WatchTestCase(unittest.TestCase):
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self.root_path = pathlib.Path(self._directory.name)
+        self._mtime = 1000000000
+        self.write('lib', 'SUCC = λn.λf.λx.f (n f x);\n1 = λf.λx.f x;\n')
+        self.write('other', '2 = λf.λx.f (f x);\n')
+        self.write('main', 'import lib;\nimport other;\nmain = lib/SUCC lib/1;\n')
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def write(self, name: str, source: str):
+        path = self.root_path / f'{name}.lcalc'
+        path.write_text(source)
+        self._mtime += 1
+        os.utime(str(path), (self._mtime, self._mtime))
+
+    def test_refresh(self):
+        context = FSContext(MAIN, self.root_path)
+        self.assertEqual(set(), context.refresh())
+        self.write('other', '2 = λf.λx.f (f x);\n')
+        self.assertEqual(set(), context.refresh())
+        self.write('lib', 'SUCC = λn.λf.λx.f (n f x);\n1 = λf.λx.f (f x);\n')
+        self.assertEqual({LIB}, context.refresh())
+        self.assertEqual({LIB, MAIN}, context.dependents({LIB}))
+        self.assertEqual(church_numerals[3], context.eval(AbsoluteIdentifier(MAIN, RelativeIdentifier('main'))))
+
+    def test_new_import(self):
+        context = FSContext(MAIN, self.root_path)
+        self.write('third', '3 = λf.λx.f (f (f x));\n')
+        self.write('other', 'import third;\n2 = third/3;\n')
+        self.assertEqual({OTHER, NamespaceIdentifier('third')}, context.refresh())
+
+    def test_invalidates_prenormalized(self):
+        context = FSContext(MAIN, self.root_path, prenormalize=True)
+        main = AbsoluteIdentifier(MAIN, RelativeIdentifier('main'))
+        self.assertEqual(church_numerals[2], context.get_def(main))
+        self.write('lib', 'SUCC = λn.λf.λx.f (n f x);\n1 = λf.λx.f (f x);\n')
+        context.refresh()
+        self.assertEqual(church_numerals[3], context.get_def(main))
+
+    def test_syntax_error_keeps_namespaces(self):
+        context = FSContext(MAIN, self.root_path)
+        self.write('lib', 'SUCC = ')
+        with self.assertRaises(Exception):
+            context.refresh()
+        with self.assertRaises(Exception):
+            context.refresh()
+        self.assertEqual(church_numerals[2], context.eval(AbsoluteIdentifier(MAIN, RelativeIdentifier('main'))))
+        self.write('lib', 'SUCC = λn.λf.λx.f (n f x);\n1 = λf.λx.f (f x);\n')
+        self.assertEqual({LIB}, context.refresh())
+        self.assertEqual(church_numerals[3], context.eval(AbsoluteIdentifier(MAIN, RelativeIdentifier('main'))))
+
+    def test_missing_import_retried(self):
+        context = FSContext(MAIN, self.root_path)
+        self.write('other', 'import third;\n2 = third/3;\n')
+        with self.assertRaises(Exception):
+            context.refresh()
+        self.write('third', '3 = λf.λx.f (f (f x));\n')
+        self.assertEqual({OTHER, NamespaceIdentifier('third')}, context.refresh())
+        self.assertEqual(church_numerals[3], context.eval(AbsoluteIdentifier(OTHER, RelativeIdentifier('2'))))
+
+    def test_memo(self):
+        context = FSContext(MAIN, self.root_path, memo=NormalFormMemo())
+        main = AbsoluteIdentifier(MAIN, RelativeIdentifier('main'))
+        self.assertEqual(church_numerals[2], context.eval(main))
+        self.write('lib', 'SUCC = λn.λf.λx.f (n f x);\n1 = λf.λx.f (f x);\n')
+        self.assertEqual({LIB}, context.refresh())
+        self.assertEqual(church_numerals[3], context.eval(main))
+
+    def test_watcher(self):
+        context = FSContext(MAIN, self.root_path)
+        main = AbsoluteIdentifier(MAIN, RelativeIdentifier('main'))
+        two = AbsoluteIdentifier(OTHER, RelativeIdentifier('2'))
+        watcher = Watcher(context, [main, two])
+        self.assertEqual({main: church_numerals[2], two: church_numerals[2]}, watcher.poll())
+        self.assertEqual({}, watcher.poll())
+        self.write('lib', 'SUCC = λn.λf.λx.f (n f x);\n1 = λf.λx.f (f x);\n')
+        self.assertEqual({main: church_numerals[3]}, watcher.poll())
+        self.assertEqual({main: church_numerals[3], two: church_numerals[2]}, watcher.results)
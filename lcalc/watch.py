@@ -0,0 +1,55 @@
+import time
+import typing
+import logging
+
+from .identifiers import AbsoluteIdentifier
+from .context import FSContext
+from .model import Def
+
+
+class Watcher(object):
+    """
+    Keeps results of entry points up to date with the source files of a `FSContext`.
+    Only entry points whose namespaces import (directly or transitively) a changed namespace
+    are evaluated again.
+    """
+    def __init__(self, context: FSContext, entry_points: typing.List[AbsoluteIdentifier]):
+        self._context = context
+        self._entry_points = entry_points
+        self._results: typing.Dict[AbsoluteIdentifier, Def] = {}
+
+    @property
+    def results(self) -> typing.Dict[AbsoluteIdentifier, Def]:
+        return dict(self._results)
+
+    def poll(self) -> typing.Dict[AbsoluteIdentifier, Def]:
+        """
+        :returns: Entry points evaluated during this poll with their new results
+        """
+        changed = self._context.refresh()
+        affected = self._context.dependents(changed) if changed else set()
+        updated = {}
+        for entry_point in self._entry_points:
+            if entry_point in self._results and entry_point.namespace_identifier not in affected:
+                continue
+            self._results.pop(entry_point, None)
+            self._results[entry_point] = self._context.eval(entry_point)
+            updated[entry_point] = self._results[entry_point]
+        return updated
+
+    def watch(
+            self,
+            callback: typing.Callable[[AbsoluteIdentifier, Def], None],
+            interval: float = 1.0,
+    ):
+        """
+        Polls for changes forever, calling `callback` with each re-evaluated entry point.
+        Errors (e.g. syntax errors in files being edited) are logged and do not stop watching.
+        """
+        while True:
+            try:
+                for entry_point, result in self.poll().items():
+                    callback(entry_point, result)
+            except Exception:
+                logging.exception('Failed to re-evaluate')
+            time.sleep(interval)
@@ -7,6 +7,7 @@ setup(
     name='lcalc',
     version=__version__,
     packages=['lcalc'],
+    package_data={'lcalc': ['benchmark_baseline.json', 'prelude.lcalc', 'prelude.lct']},
     url='https://github.com/dair-targ/lcalc',
     download_url='https://github.com/dair-targ/lcalc/tarball/%s' % __version__,
     license='GPLv3',